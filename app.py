@@ -4,14 +4,16 @@ import io
 import pandas as pd
 from datetime import datetime, timedelta
 from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import sessionmaker, declarative_base, joinedload
 from sqlalchemy import or_
 import pytesseract
 from database.db import db
 from database.models import User, BusinessCard, Company
+from database.statistics import read_statistics
 from utils.auth import AuthManager, login_required, role_required
 from utils.scanner import Scanner
 from utils.export import Exporter
+from utils.thumbnails import thumbnail_path
 from pages.card_management import render_card_management
 from pages.company_management import render_company_management
 from pages.export_management import render_export_management
@@ -211,49 +213,56 @@ def render_dashboard():
     """Render the dashboard page."""
     st.title("Dashboard")
     
-    # Get statistics
+    # Get statistics from the counters kept by database/statistics.py
     with db.get_session() as session:
-        # Card statistics
         if st.session_state.user_role == "Admin":
-            total_cards = session.query(BusinessCard).count()
-            total_companies = session.query(Company).count()
-            total_users = session.query(User).count()
+            stats = read_statistics(session)
         else:
-            total_cards = session.query(BusinessCard).filter(
-                BusinessCard.created_by_id == st.session_state.user_id
-            ).count()
-            total_companies = session.query(Company).filter(
-                Company.created_by_id == st.session_state.user_id
-            ).count()
-            total_users = 1
+            stats = read_statistics(session, user_id=st.session_state.user_id)
         
-        # Recent activity
-        recent_cards = session.query(BusinessCard).order_by(
+        # Recent activity, with each card's company in the same query
+        recent_cards = session.query(BusinessCard).options(
+            joinedload(BusinessCard.company)
+        ).order_by(
             BusinessCard.created_at.desc()
         ).limit(5).all()
+        recent_activity = [
+            (card, card.company.name if card.company else None) for card in recent_cards
+        ]
     
     # Display statistics
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric("Total Cards", total_cards)
+        st.metric("Total Cards", stats['cards'])
     with col2:
-        st.metric("Total Companies", total_companies)
+        st.metric("Total Companies", stats['companies'])
     if st.session_state.user_role == "Admin":
         with col3:
-            st.metric("Total Users", total_users)
+            st.metric("Total Users", stats['users'])
+    
+    if stats['cards_by_day']:
+        st.subheader("Cards per Day")
+        st.bar_chart(pd.DataFrame(
+            {'Cards': list(stats['cards_by_day'].values())},
+            index=list(stats['cards_by_day'].keys())
+        ))
+    if stats['cards_by_event']:
+        st.subheader("Top Events")
+        st.dataframe(pd.DataFrame(
+            {'Event': [event or "No event" for event in stats['cards_by_event']],
+             'Cards': list(stats['cards_by_event'].values())}
+        ), hide_index=True)
     
     # Display recent activity
     st.subheader("Recent Activity")
-    for card in recent_cards:
+    for card, company_name in recent_activity:
         with st.expander(f"{card.contact_name} - {card.created_at.strftime('%Y-%m-%d %H:%M:%S')}"):
             st.write(f"Position: {card.position}")
             st.write(f"Email: {card.email}")
             st.write(f"Phone: {card.phone}")
-            if card.company_id:
-                company = session.query(Company).get(card.company_id)
-                if company:
-                    st.write(f"Company: {company.name}")
+            if company_name:
+                st.write(f"Company: {company_name}")
 
 def render_company_view():
     """Render the company view page for non-admin users."""
@@ -280,8 +289,7 @@ def render_company_view():
                 with col2:
                     if company.logo_path:
                         try:
-                            logo = Image.open(company.logo_path)
-                            st.image(logo, caption="Company Logo", use_column_width=True)
+                            st.image(thumbnail_path(company.logo_path), caption="Company Logo", use_column_width=True)
                         except Exception:
                             st.warning("Logo file not found")
                     
@@ -293,7 +301,7 @@ def render_company_view():
                             'phone': company.contact_primary,
                             'website': company.website,
                             'address': address.strip(", ")
-                        })
+                        }, version=company.updated_at)
                         st.image(qr_image_bytes, caption="Company QR Code", width=200)
 
 def main():
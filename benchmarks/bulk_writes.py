@@ -0,0 +1,73 @@
+"""
+Compare rows per second of DatabaseManager's per-item add_item with the bulk
+add_items, upsert_items and update_where methods, on a scratch database.
+
+Usage: python -m benchmarks.bulk_writes [--rows N] [--chunk-size N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# Point the DatabaseManager at a scratch database before it is created
+_SCRATCH = tempfile.TemporaryDirectory()
+os.environ['CARDSNAP_DATABASE_URL'] = f"sqlite:///{os.path.join(_SCRATCH.name, 'bulk.db')}"
+
+from database.db import db  # noqa: E402
+from database.models import Blob, BusinessCard, User  # noqa: E402
+
+def card_rows(count: int, offset: int = 0) -> list:
+    """Column dicts for count synthetic cards."""
+    return [
+        {'contact_name': f"Contact {i}", 'email': f"c{i}@example.com", 'phone': f"+1 555 {i:07d}",
+         'detected_text': f"Contact {i}\nExample Corp\n+1 555 {i:07d}", 'created_by_id': 1}
+        for i in range(offset, offset + count)
+    ]
+
+def report(name: str, rows: int, seconds: float):
+    print(f"{name:36} {rows:7d} rows in {seconds:6.2f}s = {rows / seconds:9.0f} rows/s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--per-item-rows', type=int, default=1000,
+                        help="Rows for the slow per-item path, extrapolated per second")
+    parser.add_argument('--chunk-size', type=int, default=500)
+    args = parser.parse_args()
+
+    db.init_db()
+    db.add_item(User(username='bench', email='bench@example.com', password='x', role='User'))
+
+    started = time.perf_counter()
+    for row in card_rows(args.per_item_rows):
+        db.add_item(BusinessCard(**row))
+    report("add_item, one transaction per row", args.per_item_rows, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    db.add_items(BusinessCard, card_rows(args.rows), chunk_size=args.chunk_size)
+    report("add_items", args.rows, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    ids = db.add_items(BusinessCard, card_rows(args.rows), chunk_size=args.chunk_size, returning=True)
+    report("add_items with RETURNING ids", len(ids), time.perf_counter() - started)
+
+    blobs = [{'path': f"uploads/{i:064x}.webp", 'digest': f"{i:064x}", 'size': i, 'ref_count': 0}
+             for i in range(args.rows)]
+    started = time.perf_counter()
+    db.upsert_items(Blob, blobs, ['path'], chunk_size=args.chunk_size)
+    report("upsert_items, all new", args.rows, time.perf_counter() - started)
+
+    for blob in blobs:
+        blob['size'] += 1
+    started = time.perf_counter()
+    db.upsert_items(Blob, blobs, ['path'], update_columns=['size'], chunk_size=args.chunk_size)
+    report("upsert_items, all conflicting", args.rows, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    updated = db.update_where(BusinessCard, {'event_name': "Trade fair"}, BusinessCard.id <= args.rows)
+    report("update_where", updated, time.perf_counter() - started)
+
+    db.engine.dispose()
+
+if __name__ == '__main__':
+    main()
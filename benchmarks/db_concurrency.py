@@ -0,0 +1,103 @@
+"""
+Compare concurrent read/write throughput of the default SQLite engine with
+the tuned one DatabaseManager uses (WAL and the SQLITE_PRAGMAS), on a
+scratch copy of the schema. Each thread mimics a Streamlit session: mostly
+list-page reads with an occasional card insert.
+
+Usage: python -m benchmarks.db_concurrency [--threads N] [--seconds S] [--cards N]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.exc import OperationalError
+
+from benchmarks.seed import seed
+from database.db import make_engine
+from database.models import BusinessCard
+
+def run(engine, threads: int, seconds: float, write_ratio: float) -> dict:
+    """Hammer engine from threads for seconds and return throughput and error counts."""
+    stop = time.perf_counter() + seconds
+    lock = threading.Lock()
+    totals = {'reads': 0, 'writes': 0, 'locked': 0}
+    write_latencies = []
+
+    def session_thread(seed_value):
+        rng = random.Random(seed_value)
+        counts = {'reads': 0, 'writes': 0, 'locked': 0}
+        latencies = []
+        while time.perf_counter() < stop:
+            try:
+                if rng.random() < write_ratio:
+                    started = time.perf_counter()
+                    with engine.begin() as connection:
+                        connection.execute(insert(BusinessCard).values(
+                            contact_name="New contact", detected_text="x" * 200, created_by_id=1
+                        ))
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    counts['writes'] += 1
+                else:
+                    with engine.connect() as connection:
+                        connection.execute(select(func.count()).select_from(BusinessCard)).scalar()
+                        connection.execute(
+                            select(BusinessCard.id, BusinessCard.contact_name)
+                            .order_by(BusinessCard.id.desc()).limit(50)
+                        ).all()
+                    counts['reads'] += 1
+            except OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                counts['locked'] += 1
+        with lock:
+            for key, value in counts.items():
+                totals[key] += value
+            write_latencies.extend(latencies)
+
+    workers = [threading.Thread(target=session_thread, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    write_latencies.sort()
+    totals['write_p95_ms'] = (
+        write_latencies[min(len(write_latencies) - 1, int(len(write_latencies) * 0.95))]
+        if write_latencies else 0.0
+    )
+    totals['write_median_ms'] = statistics.median(write_latencies) if write_latencies else 0.0
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--cards', type=int, default=5000)
+    parser.add_argument('--write-ratio', type=float, default=0.1)
+    args = parser.parse_args()
+
+    engines = {
+        # What DatabaseManager used to build
+        'default': lambda url: create_engine(url),
+        'tuned': lambda url: make_engine(url, pool_size=args.threads, echo=False),
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for name, factory in engines.items():
+            url = f"sqlite:///{os.path.join(directory, name + '.db')}"
+            engine = factory(url)
+            seed(engine, args.cards, users=1)
+            totals = run(engine, args.threads, args.seconds, args.write_ratio)
+            engine.dispose()
+            print(f"{name}: {totals['reads'] / args.seconds:.0f} reads/s, "
+                  f"{totals['writes'] / args.seconds:.0f} writes/s, "
+                  f"{totals['locked']} 'database is locked' errors, "
+                  f"write median {totals['write_median_ms']:.1f} ms, p95 {totals['write_p95_ms']:.1f} ms "
+                  f"({args.threads} threads)")
+
+if __name__ == '__main__':
+    main()
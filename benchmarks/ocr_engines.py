@@ -0,0 +1,54 @@
+"""
+Report per-image OCR latency for every available OCR backend.
+
+Usage: python -m benchmarks.ocr_engines [image_dir] [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import time
+
+from utils.ocr_engine import _ENGINES, create_engine
+from utils.scanner import OCR_CONFIG, ScanJob
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('image_dir', nargs='?', default='businesscard')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # Benchmark the images tesseract actually sees, after preprocessing
+    images = []
+    for filename in sorted(os.listdir(args.image_dir)):
+        with open(os.path.join(args.image_dir, filename), 'rb') as f:
+            job = ScanJob(f.read())
+        image, _ = job.preprocessor.process(job.gray, oriented=True)
+        images.append(image)
+
+    for name in _ENGINES:
+        try:
+            engine = create_engine(name)
+            # Warm up so one-off initialisation is reported separately
+            started = time.perf_counter()
+            engine.image_to_string(images[0], **OCR_CONFIG)
+            first_ms = (time.perf_counter() - started) * 1000
+        except Exception as e:
+            print(f"{name}: unavailable ({e})")
+            continue
+
+        latencies = []
+        for _ in range(args.repeat):
+            for image in images:
+                started = time.perf_counter()
+                engine.image_to_string(image, **OCR_CONFIG)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"{name}: first call {first_ms:.0f} ms, "
+              f"mean {statistics.mean(latencies):.1f} ms, "
+              f"median {statistics.median(latencies):.1f} ms, "
+              f"p95 {p95:.1f} ms over {len(latencies)} images")
+
+if __name__ == '__main__':
+    main()
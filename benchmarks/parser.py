@@ -0,0 +1,155 @@
+"""
+Check the business card text parser against its previous implementation and
+report parses per second over the OCR text corpus.
+
+Usage: python -m benchmarks.parser [--rounds N]
+"""
+import argparse
+import os
+import re
+import time
+
+from utils.scanner import Scanner
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'ocr_text')
+
+def legacy_parse(text: str) -> dict:
+    """The parser before precompilation, kept as the reference for identical output."""
+    info = {
+        'name': None,
+        'position': None,
+        'email': None,
+        'phone': None,
+        'mobile': None,
+        'fax': None,
+        'company': None,
+        'website': None,
+        'address': None,
+        'city': None,
+        'state': None,
+        'postal_code': None,
+        'country': None,
+        'department': None,
+        'linkedin': None,
+        'twitter': None,
+        'facebook': None,
+        'notes': None
+    }
+
+    # Split text into lines and remove empty lines
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+
+    # Extract email addresses
+    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+    emails = re.findall(email_pattern, text)
+    if emails:
+        info['email'] = emails[0]
+
+    # Extract phone numbers
+    phone_pattern = r'(?:\+?\d{1,3}[-.]?)?\(?\d{3}\)?[-.]?\d{3}[-.]?\d{4}'
+    phones = re.findall(phone_pattern, text)
+    if phones:
+        # Assume first number is primary phone
+        info['phone'] = phones[0]
+        # If there are multiple numbers, assume second is mobile
+        if len(phones) > 1:
+            info['mobile'] = phones[1]
+        # If there are three numbers, assume third is fax
+        if len(phones) > 2:
+            info['fax'] = phones[2]
+
+    # Extract website
+    website_pattern = r'(?:https?:\/\/)?(?:www\.)?([a-zA-Z0-9-]+(?:\.[a-zA-Z]{2,})+)'
+    websites = re.findall(website_pattern, text)
+    if websites:
+        info['website'] = websites[0]
+
+    # Extract social media handles
+    social_patterns = {
+        'linkedin': r'(?:linkedin\.com/in/|linkedin:?)([a-zA-Z0-9_-]+)',
+        'twitter': r'(?:twitter\.com/|twitter:?)([a-zA-Z0-9_]+)',
+        'facebook': r'(?:facebook\.com/|facebook:?)([a-zA-Z0-9_.]+)'
+    }
+    for platform, pattern in social_patterns.items():
+        matches = re.findall(pattern, text.lower())
+        if matches:
+            info[platform] = matches[0]
+
+    # Extract address components
+    address_pattern = r'\b\d+\s+[A-Za-z0-9\s,.-]+\b'
+    addresses = re.findall(address_pattern, text)
+    if addresses:
+        info['address'] = addresses[0]
+
+    # Try to identify postal code
+    postal_pattern = r'\b\d{5}(?:-\d{4})?\b'
+    postal_codes = re.findall(postal_pattern, text)
+    if postal_codes:
+        info['postal_code'] = postal_codes[0]
+
+    # Try to identify name and position
+    # Usually, name is in larger font and appears first
+    if lines:
+        info['name'] = lines[0]
+        if len(lines) > 1:
+            info['position'] = lines[1]
+
+    # Try to identify company name
+    # Often appears after position or in larger font
+    company_indicators = ['inc', 'corp', 'ltd', 'llc', 'company', 'co.']
+    for line in lines:
+        lower_line = line.lower()
+        if any(indicator in lower_line for indicator in company_indicators):
+            info['company'] = line
+            break
+
+    # Try to identify department
+    department_indicators = ['department', 'dept', 'division', 'team']
+    for line in lines:
+        lower_line = line.lower()
+        if any(indicator in lower_line for indicator in department_indicators):
+            info['department'] = line
+            break
+
+    return info
+
+def load_corpus() -> dict:
+    """Read every OCR text fixture, keyed by file name."""
+    corpus = {}
+    for filename in sorted(os.listdir(FIXTURES_DIR)):
+        with open(os.path.join(FIXTURES_DIR, filename), encoding='utf-8') as f:
+            corpus[filename] = f.read()
+    return corpus
+
+def parses_per_second(parse, texts: list, rounds: int) -> float:
+    """Time rounds passes of parse over texts."""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            parse(text)
+    return rounds * len(texts) / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    mismatches = [name for name, text in corpus.items()
+                  if Scanner._parse_business_card_text(text) != legacy_parse(text)]
+    for name in mismatches:
+        print(f"MISMATCH {name}")
+        print(f"  legacy:  {legacy_parse(corpus[name])}")
+        print(f"  current: {Scanner._parse_business_card_text(corpus[name])}")
+
+    texts = list(corpus.values())
+    legacy_rate = parses_per_second(legacy_parse, texts, args.rounds)
+    current_rate = parses_per_second(Scanner._parse_business_card_text, texts, args.rounds)
+    print(f"{len(corpus)} fixtures, {len(mismatches)} mismatches")
+    print(f"legacy:  {legacy_rate:,.0f} parses/s")
+    print(f"current: {current_rate:,.0f} parses/s ({current_rate / legacy_rate:.2f}x)")
+    if mismatches:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare OCR wall time and parsed fields with and without preprocessing.
+
+Usage: python -m benchmarks.preprocess [image_dir] [--target-dpi N] [--binarize] [--deskew]
+"""
+import argparse
+import os
+import time
+
+from PIL import Image
+
+from utils.ocr_engine import get_engine
+from utils.scanner import OCR_CONFIG, ImagePreprocessor, Scanner
+
+def time_ocr(image: Image.Image) -> tuple[str, float]:
+    """Run the OCR engine directly (bypassing the OCR cache) and time it in ms."""
+    started = time.perf_counter()
+    text = get_engine().image_to_string(image, **OCR_CONFIG)
+    return text, (time.perf_counter() - started) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('image_dir', nargs='?', default='businesscard')
+    parser.add_argument('--target-dpi', type=int, default=300,
+                        help="Downscale to this DPI for a 2 inch card side, 0 to keep full resolution")
+    parser.add_argument('--binarize', action='store_true')
+    parser.add_argument('--deskew', action='store_true')
+    args = parser.parse_args()
+
+    preprocessor = ImagePreprocessor(target_dpi=args.target_dpi or None, binarize=args.binarize,
+                                     deskew=args.deskew)
+    total_raw, total_pre, total_stage = 0.0, 0.0, 0.0
+
+    for filename in sorted(os.listdir(args.image_dir)):
+        path = os.path.join(args.image_dir, filename)
+        with Image.open(path) as image:
+            image.load()
+            raw_text, raw_ms = time_ocr(image)
+            processed, timings = preprocessor.process(image)
+            pre_text, pre_ms = time_ocr(processed)
+
+        stage_ms = sum(timings.values())
+        total_raw += raw_ms
+        total_pre += pre_ms
+        total_stage += stage_ms
+
+        raw_fields = Scanner._parse_business_card_text(raw_text)
+        pre_fields = Scanner._parse_business_card_text(pre_text)
+        changed = sorted(k for k in raw_fields if raw_fields[k] != pre_fields[k])
+
+        print(f"{filename}: {image.size[0]}x{image.size[1]} -> {processed.size[0]}x{processed.size[1]}")
+        print(f"  raw OCR {raw_ms:.0f} ms | preprocess {stage_ms:.0f} ms + OCR {pre_ms:.0f} ms")
+        print("  stages: " + ", ".join(f"{name} {ms:.1f} ms" for name, ms in timings.items()))
+        print(f"  fields that differ: {', '.join(changed) if changed else 'none'}")
+        for key in changed:
+            print(f"    {key}: {raw_fields[key]!r} -> {pre_fields[key]!r}")
+
+    print(f"\nTotal raw OCR: {total_raw:.0f} ms")
+    print(f"Total preprocess + OCR: {total_stage + total_pre:.0f} ms")
+
+if __name__ == '__main__':
+    main()
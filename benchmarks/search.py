@@ -0,0 +1,67 @@
+"""
+Measure full-text search latency over a synthetic card table, against the
+LIKE scan the pages used before. Rows are inserted through the base tables,
+so the index is filled by the same triggers the application relies on.
+
+Usage: python -m benchmarks.search [--cards N] [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from benchmarks.seed import seed
+from database.db import make_engine
+from database.models import BusinessCard, Company
+from database.search import search
+
+QUERIES = ["smith", "jo", "maria garcia", "cto", "logistics berlin", "5550", "acme", "nonexistentword"]
+
+def timed(function, repeat: int) -> list:
+    """Latencies of repeat calls in milliseconds."""
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cards', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--limit', type=int, default=50, help="Results fetched per search, like one page")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(f"sqlite:///{os.path.join(directory, 'search.db')}", echo=False)
+        started = time.perf_counter()
+        seed(engine, args.cards, companies=max(1, args.cards // 20), users=1)
+        print(f"Inserted and indexed {args.cards} cards in {time.perf_counter() - started:.1f}s")
+
+        with Session(engine) as session:
+            for text in QUERIES:
+                def fts():
+                    matches = search(session, BusinessCard, text)
+                    return (session.query(BusinessCard).join(matches, BusinessCard.id == matches.c.id)
+                            .order_by(matches.c.rank).limit(args.limit).all())
+
+                def like():
+                    # The View Cards query before full-text search
+                    return (session.query(BusinessCard).outerjoin(Company).filter(or_(
+                        Company.name.ilike(f"%{text}%"), BusinessCard.contact_name.ilike(f"%{text}%")
+                    )).order_by(BusinessCard.created_at.desc()).limit(args.limit).all())
+
+                fts_ms = timed(fts, args.repeat)
+                like_ms = timed(like, args.repeat)
+                print(f"{text!r:20} fts median {statistics.median(fts_ms):7.1f} ms, max {max(fts_ms):7.1f} ms | "
+                      f"like median {statistics.median(like_ms):7.1f} ms ({len(fts())} results)")
+                session.expunge_all()
+        engine.dispose()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Synthetic data for the benchmarks and tests: users, companies, cards and
+export logs, the same for a given size on every run. Rows go in through the
+base tables, so the search index and the statistics counters are filled by
+the triggers the application relies on.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import insert, text
+
+from database.models import Base, BusinessCard, Company, ExportLog, User
+
+FIRST_NAMES = ["John", "Maria", "Wei", "Aisha", "Lars", "Priya", "Carlos", "Yuki", "Olga", "Ahmed"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Khan", "Jensen", "Patel", "Silva", "Tanaka", "Ivanova", "Hassan"]
+POSITIONS = ["Sales Manager", "CTO", "Account Executive", "Founder", "Engineer", "Buyer"]
+INDUSTRIES = ["Logistics", "Software", "Manufacturing", "Retail", "Consulting"]
+CITIES = ["Berlin", "Austin", "Mumbai", "Osaka", "Lisbon", "Nairobi"]
+BRANDS = ["Acme", "Globex", "Initech", "Umbrella"]
+
+# Newest creation time; older rows go back a minute per card and an hour per company
+NOW = datetime(2025, 1, 1)
+CHUNK_SIZE = 50000
+
+def company_name(i: int) -> str:
+    """Name of the i-th seeded company, counting from 0."""
+    return f"{BRANDS[i % len(BRANDS)]} {i}"
+
+def seed(engine, cards: int, companies: Optional[int] = None, users: int = 10):
+    """
+    Create the schema and insert users, companies (one per ten cards unless
+    given), cards spread evenly over both and one export per company, then
+    ANALYZE. Ids count from 1 in insertion order.
+    """
+    companies = max(1, cards // 10) if companies is None else companies
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(User), [
+            {'username': f"user{i}", 'email': f"user{i}@example.com", 'password': 'x', 'role': 'User'}
+            for i in range(users)
+        ])
+        connection.execute(insert(Company), [
+            {'name': company_name(i), 'email': f"info@company{i}.com", 'industry': INDUSTRIES[i % len(INDUSTRIES)],
+             'city': CITIES[i % len(CITIES)], 'created_by_id': i % users + 1, 'created_at': NOW - timedelta(hours=i)}
+            for i in range(companies)
+        ])
+        connection.execute(insert(ExportLog), [
+            {'user_id': i % users + 1, 'export_type': 'CSV', 'export_date': NOW - timedelta(hours=i)}
+            for i in range(companies)
+        ])
+    for start in range(0, cards, CHUNK_SIZE):
+        with engine.begin() as connection:
+            connection.execute(insert(BusinessCard), [
+                {'contact_name': f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[i // len(FIRST_NAMES) % len(LAST_NAMES)]}",
+                 'position': POSITIONS[i % len(POSITIONS)], 'email': f"contact{i}@example.com",
+                 'phone': f"+1 555-{i % 10000:04d}", 'company_id': i % companies + 1,
+                 'created_by_id': i % users + 1, 'event_name': f"Event {i % 20}",
+                 'detected_text': f"Card {i} scanned text with some words", 'created_at': NOW - timedelta(minutes=i)}
+                for i in range(start, min(cards, start + CHUNK_SIZE))
+            ])
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
@@ -1,17 +1,69 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.exc import SQLAlchemyError
 from contextlib import contextmanager
 import logging
-from typing import Optional
+import os
+from typing import Optional, Sequence
 from sqlalchemy import inspect
 
 from .models import Base
+from . import search  # noqa: F401 -- creates the full-text search index with the schema
+from . import statistics  # noqa: F401 -- creates the dashboard counter triggers with the schema
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Engine settings, overridable from the environment
+DATABASE_URL = os.environ.get('CARDSNAP_DATABASE_URL', 'sqlite:///cardsnap.db')
+DATABASE_POOL_SIZE = int(os.environ.get('CARDSNAP_DB_POOL_SIZE', '10'))
+DATABASE_ECHO = os.environ.get('CARDSNAP_DB_ECHO', '').lower() in ('1', 'true', 'yes')
+# Rows per executemany in the bulk write methods
+BULK_CHUNK_SIZE = int(os.environ.get('CARDSNAP_DB_BULK_CHUNK_SIZE', '500'))
+
+# Set on every SQLite connection. WAL lets readers run alongside the single
+# writer, and busy_timeout makes a blocked writer wait instead of failing
+# with "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',  # Durable in WAL mode except across power loss
+    'busy_timeout': int(os.environ.get('CARDSNAP_SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'cache_size': -64000,  # Negative means KiB: 64 MB of page cache
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+def make_engine(url: str = DATABASE_URL, pool_size: int = DATABASE_POOL_SIZE,
+                echo: bool = DATABASE_ECHO, pragmas: Optional[dict] = None) -> Engine:
+    """
+    Create the application's engine. SQLite connections get SQLITE_PRAGMAS
+    (or pragmas, if given) through a connect hook; pass pragmas={} for
+    SQLite's defaults.
+    """
+    url = make_url(url)
+    options = {'echo': echo}
+    in_memory = url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+    if not in_memory:
+        options['pool_size'] = pool_size
+    engine = create_engine(url, **options)
+
+    if url.get_backend_name() == 'sqlite':
+        pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+        if in_memory:
+            # An in-memory database has no journal file to put in WAL mode
+            pragmas = {name: value for name, value in pragmas.items() if name != 'journal_mode'}
+
+        @event.listens_for(engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+    return engine
+
 class DatabaseManager:
     _instance = None
     
@@ -25,7 +77,7 @@ class DatabaseManager:
         if self._initialized:
             return
             
-        self.engine = create_engine('sqlite:///cardsnap.db')
+        self.engine = make_engine()
         self.SessionFactory = sessionmaker(bind=self.engine, expire_on_commit=False)
         self.Session = scoped_session(self.SessionFactory)
         self._initialized = True
@@ -110,6 +162,86 @@ class DatabaseManager:
                 logger.error(f"Error deleting item from database: {e}")
                 raise
     
+    # The bulk methods below write through Core in a single transaction.
+    # ORM events do not fire for them, so after changing image paths in
+    # bulk, rebuild blob reference counts with utils.blob_store.recount_references.
+    
+    def add_items(self, model, rows: Sequence[dict], chunk_size: int = BULK_CHUNK_SIZE,
+                  returning: bool = False) -> Optional[list]:
+        """
+        Insert rows (dicts of column values) into model's table in one
+        transaction, chunk_size rows per executemany. With returning, the
+        new primary keys are returned in the order of rows.
+        """
+        table = model.__table__
+        statement = insert(table)
+        if returning:
+            statement = statement.returning(*table.primary_key.columns, sort_by_parameter_order=True)
+        ids = [] if returning else None
+        with self.get_session() as session:
+            try:
+                connection = session.connection()
+                for start in range(0, len(rows), chunk_size):
+                    result = connection.execute(statement, list(rows[start:start + chunk_size]))
+                    if returning:
+                        ids.extend(result.scalars().all())
+            except SQLAlchemyError as e:
+                logger.error(f"Error adding items to database: {e}")
+                raise
+        return ids
+    
+    def upsert_items(self, model, rows: Sequence[dict], conflict_columns: Sequence[str],
+                     update_columns: Optional[Sequence[str]] = None, chunk_size: int = BULK_CHUNK_SIZE,
+                     returning: bool = False) -> Optional[list]:
+        """
+        Insert rows, updating the existing row instead where one with the
+        same conflict_columns (a unique key) exists. update_columns defaults
+        to every other column in the rows; pass [] to leave existing rows
+        untouched. With returning, the primary keys of the inserted or
+        updated rows are returned in the order of rows (skipped rows are left out).
+        """
+        table = model.__table__
+        dialect_insert = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}.get(self.engine.dialect.name)
+        if dialect_insert is None:
+            raise ValueError(f"upsert_items does not support {self.engine.dialect.name}")
+        if update_columns is None:
+            update_columns = [column for column in (rows[0] if rows else {}) if column not in conflict_columns]
+        statement = dialect_insert(table)
+        if update_columns:
+            statement = statement.on_conflict_do_update(
+                index_elements=list(conflict_columns),
+                set_={column: statement.excluded[column] for column in update_columns}
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=list(conflict_columns))
+        if returning:
+            statement = statement.returning(*table.primary_key.columns, sort_by_parameter_order=True)
+        ids = [] if returning else None
+        with self.get_session() as session:
+            try:
+                connection = session.connection()
+                for start in range(0, len(rows), chunk_size):
+                    result = connection.execute(statement, list(rows[start:start + chunk_size]))
+                    if returning:
+                        ids.extend(result.scalars().all())
+            except SQLAlchemyError as e:
+                logger.error(f"Error upserting items in database: {e}")
+                raise
+        return ids
+    
+    def update_where(self, model, values: dict, *criteria) -> int:
+        """
+        Set values on every row of model matching criteria (all rows if none)
+        with one UPDATE statement and return the number of rows changed.
+        """
+        statement = update(model.__table__).where(*criteria).values(**values)
+        with self.get_session() as session:
+            try:
+                return session.connection().execute(statement).rowcount
+            except SQLAlchemyError as e:
+                logger.error(f"Error updating items in database: {e}")
+                raise
+    
     def get_all_items(self, model):
         """Get all items of a specific model."""
         with self.get_session() as session:
@@ -120,4 +252,10 @@ class DatabaseManager:
                 raise
 
 # Create a global instance of DatabaseManager
-db = DatabaseManager() 
\ No newline at end of file
+db = DatabaseManager()
+
+# Forked workers (batch scans, the folder watcher) must not reuse the parent's
+# pooled connections; close=False leaves them open for the parent. Spawned
+# processes, as on Windows, import a fresh engine anyway.
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=lambda: db.engine.dispose(close=False)) 
\ No newline at end of file
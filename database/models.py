@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, JSON
 from sqlalchemy.orm import relationship, declarative_base, Mapped, mapped_column
 from sqlalchemy.sql import func
 from typing import List, Optional
@@ -27,6 +27,11 @@ class User(Base):
 
 class Company(Base):
     __tablename__ = 'companies'
+    __table_args__ = (
+        Index('ix_companies_name', 'name'),  # Lookup by name when saving a card
+        Index('ix_companies_created_at', 'created_at'),  # Export date range
+        Index('ix_companies_created_by_created_at', 'created_by_id', 'created_at'),  # Per-user counts and exports
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -56,6 +61,11 @@ class Company(Base):
 
 class BusinessCard(Base):
     __tablename__ = 'business_cards'
+    __table_args__ = (
+        Index('ix_business_cards_created_at', 'created_at'),  # Newest-first lists and export date range
+        Index('ix_business_cards_company_created_at', 'company_id', 'created_at'),  # Cards of a company
+        Index('ix_business_cards_created_by_created_at', 'created_by_id', 'created_at'),  # Per-user counts and exports
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     company_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('companies.id'), nullable=True)
@@ -79,6 +89,7 @@ class BusinessCard(Base):
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     detected_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     parsed_data: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)  # Store all parsed data
+    ocr_lines: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)  # Region OCR lines with confidence and bbox
     qr_code_data: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     image_path: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
@@ -91,6 +102,10 @@ class BusinessCard(Base):
 
 class ExportLog(Base):
     __tablename__ = 'export_logs'
+    __table_args__ = (
+        Index('ix_export_logs_export_date', 'export_date'),  # Export history, newest first
+        Index('ix_export_logs_user_export_date', 'user_id', 'export_date'),  # A user's export history
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'))
@@ -98,4 +113,40 @@ class ExportLog(Base):
     export_date: Mapped[datetime] = mapped_column(DateTime, default=func.now())
     items_exported: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     file_path: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
-    status: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)  # Success, Failed, In Progress 
\ No newline at end of file
+    status: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)  # Success, Failed, In Progress 
+
+class CardJob(Base):
+    __tablename__ = 'card_jobs'
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default='queued', index=True)  # queued, running, done, failed, superseded
+    image_digest: Mapped[str] = mapped_column(String(64), nullable=False)
+    image_path: Mapped[str] = mapped_column(String(255), nullable=False)
+    options: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    result: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)  # raw_text, parsed_info, qr_code_data, ocr_lines
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    card_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('business_cards.id'), nullable=True)  # Set once saved
+    created_by_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'))
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+class Blob(Base):
+    __tablename__ = 'blobs'
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    path: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
+    digest: Mapped[str] = mapped_column(String(64), nullable=False, index=True)  # SHA-256 of the upload as received
+    size: Mapped[int] = mapped_column(Integer, nullable=False)  # Bytes stored
+    original_size: Mapped[Optional[int]] = mapped_column(Integer)  # Bytes uploaded; None until recompressed
+    ref_count: Mapped[int] = mapped_column(Integer, default=0)  # BusinessCard.image_path and Company.logo_path references
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+
+class Statistic(Base):
+    __tablename__ = 'statistics'
+    
+    # Counters kept up to date by triggers (see database/statistics.py)
+    name: Mapped[str] = mapped_column(String(30), primary_key=True)  # cards, companies, users, cards_by_event, cards_by_day
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True, default=0)  # 0 for all users
+    bucket: Mapped[str] = mapped_column(String(100), primary_key=True, default='')  # Event name or YYYY-MM-DD for the breakdowns
+    value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -0,0 +1,80 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from .models import BusinessCard, Company, ExportLog, User
+
+# Queries behind the list pages, each loading everything its page shows in a
+# fixed number of statements however many rows there are: the company of a
+# card comes in the same query (joinedload), the cards of the listed
+# companies in one more (selectinload, one IN query per 500 companies), and
+# counts per row from a single GROUP BY.
+
+def company_names(session) -> list:
+    """Names of all companies, alphabetical, for filter drop-downs."""
+    return list(session.scalars(select(Company.name).distinct().order_by(Company.name)))
+
+def cards_for_export(session, start: datetime, end: datetime, company_name: Optional[str] = None,
+                     user_id: Optional[int] = None) -> list:
+    """
+    Cards created between start and end, optionally of one company or
+    created by one user, each with its company loaded.
+    """
+    query = session.query(BusinessCard).options(joinedload(BusinessCard.company)).filter(
+        BusinessCard.created_at >= start, BusinessCard.created_at <= end
+    )
+    if company_name is not None:
+        query = query.join(Company).filter(Company.name == company_name)
+    if user_id is not None:
+        query = query.filter(BusinessCard.created_by_id == user_id)
+    return query.all()
+
+def companies_for_export(session, start: datetime, end: datetime, user_id: Optional[int] = None) -> list:
+    """Companies created between start and end, optionally by one user."""
+    query = session.query(Company).filter(Company.created_at >= start, Company.created_at <= end)
+    if user_id is not None:
+        query = query.filter(Company.created_by_id == user_id)
+    return query.all()
+
+def companies_with_cards(session) -> list:
+    """All companies, each with the name and position of its cards loaded."""
+    return session.query(Company).options(
+        selectinload(Company.business_cards).load_only(
+            BusinessCard.company_id, BusinessCard.contact_name, BusinessCard.position
+        )
+    ).order_by(Company.name).all()
+
+def card_counts_by_company(session, company_ids) -> dict:
+    """Number of cards of each company id, zero for those without cards."""
+    company_ids = list(company_ids)
+    counts = dict.fromkeys(company_ids, 0)
+    if company_ids:
+        counts.update(session.execute(
+            select(BusinessCard.company_id, func.count())
+            .where(BusinessCard.company_id.in_(company_ids))
+            .group_by(BusinessCard.company_id)
+        ).all())
+    return counts
+
+def users_with_activity(session) -> list:
+    """All users as (user, cards created, companies created)."""
+    cards = (select(BusinessCard.created_by_id.label('user_id'), func.count().label('count'))
+             .group_by(BusinessCard.created_by_id).subquery())
+    companies = (select(Company.created_by_id.label('user_id'), func.count().label('count'))
+                 .group_by(Company.created_by_id).subquery())
+    rows = (
+        session.query(User, func.coalesce(cards.c.count, 0), func.coalesce(companies.c.count, 0))
+        .outerjoin(cards, cards.c.user_id == User.id)
+        .outerjoin(companies, companies.c.user_id == User.id)
+        .order_by(User.id).all()
+    )
+    return [tuple(row) for row in rows]
+
+def export_history(session, user_id: Optional[int] = None) -> list:
+    """Export logs newest first as (log, username), optionally of one user."""
+    query = session.query(ExportLog, User.username).outerjoin(User, User.id == ExportLog.user_id)
+    if user_id is not None:
+        query = query.filter(ExportLog.user_id == user_id)
+    return [tuple(row) for row in query.order_by(ExportLog.export_date.desc()).all()]
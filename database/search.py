@@ -0,0 +1,181 @@
+import re
+from typing import Optional
+
+from sqlalchemy import column, event, func, literal, literal_column, or_, select, table, union_all
+from sqlalchemy.sql import Subquery
+
+from .models import Base, BusinessCard, Company
+
+# Full-text search over cards and companies with SQLite FTS5. The index
+# tables are maintained by triggers, so every writer (ORM, Core updates,
+# scripts using sqlite3) keeps them in sync. Other databases fall back to
+# LIKE matching through the same API.
+
+# Column weights for bm25 ranking, in the column order of each table
+CARD_SEARCH_COLUMNS = {
+    'contact_name': 10.0, 'position': 3.0, 'email': 5.0, 'phone': 5.0,
+    'detected_text': 1.0, 'company_name': 8.0, 'industry': 2.0, 'location': 2.0,
+}
+COMPANY_SEARCH_COLUMNS = {'name': 10.0, 'industry': 3.0, 'location': 2.0}
+# Only the newest this many matches are ranked. bm25 costs time per match,
+# and a term on a quarter of a million cards would otherwise take seconds.
+# Older matches follow the ranked ones, newest first, with a rank of
+# SEARCH_UNRANKED - id: above any bm25 rank (those are negative) and still
+# exact as a float, so (rank, id) keyset paging reaches every match.
+SEARCH_RANK_WINDOW = 2000
+SEARCH_UNRANKED = 2 ** 52
+
+def _digits(expression: str) -> str:
+    """SQL for expression with phone punctuation removed."""
+    for char in (' ', '-', '(', ')', '.', '+', '/'):
+        expression = f"replace({expression}, '{char}', '')"
+    return expression
+
+def _phone_terms(expression: str) -> str:
+    """SQL for the digits of a phone number with and without a 1-3 digit country code."""
+    digits = _digits(expression)
+    return _join(digits, *(f"substr({digits}, {start})" for start in (2, 3, 4)))
+
+def _join(*expressions: str) -> str:
+    """SQL concatenation of nullable expressions, space separated."""
+    return " || ' ' || ".join(f"coalesce({expression}, '')" for expression in expressions)
+
+_CARD_ROWS = f"""
+    SELECT card.id, card.contact_name, card.position, card.email,
+           {_join('card.phone', 'card.mobile', _phone_terms('card.phone'), _phone_terms('card.mobile'))},
+           card.detected_text, company.name, company.industry,
+           {_join('card.city', 'card.state', 'card.country', 'company.city', 'company.state', 'company.country')}
+    FROM business_cards AS card LEFT JOIN companies AS company ON company.id = card.company_id"""
+_INSERT_CARDS = f"INSERT INTO cards_fts(rowid, {', '.join(CARD_SEARCH_COLUMNS)}) {_CARD_ROWS}"
+_INSERT_COMPANY = (
+    f"INSERT INTO companies_fts(rowid, {', '.join(COMPANY_SEARCH_COLUMNS)}) "
+    f"VALUES (new.id, new.name, new.industry, {_join('new.city', 'new.state', 'new.country')})"
+)
+_REINDEX_COMPANY_CARDS = f"""
+        DELETE FROM cards_fts WHERE rowid IN (SELECT id FROM business_cards WHERE company_id = old.id);
+        {_INSERT_CARDS} WHERE card.company_id = old.id;"""
+
+def _rank_setting(table_name: str, weights: dict) -> str:
+    """Make bm25 with the column weights the table's default rank."""
+    return (f"INSERT INTO {table_name}({table_name}, rank) "
+            f"VALUES ('rank', 'bm25({', '.join(str(weight) for weight in weights.values())})')")
+
+# prefix='2 3' indexes short prefixes so "jo*" does not walk every term
+SEARCH_SCHEMA = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5("
+    f"{', '.join(CARD_SEARCH_COLUMNS)}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS companies_fts USING fts5("
+    f"{', '.join(COMPANY_SEARCH_COLUMNS)}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    _rank_setting('cards_fts', CARD_SEARCH_COLUMNS),
+    _rank_setting('companies_fts', COMPANY_SEARCH_COLUMNS),
+    f"""CREATE TRIGGER IF NOT EXISTS business_cards_fts_insert AFTER INSERT ON business_cards BEGIN
+        {_INSERT_CARDS} WHERE card.id = new.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS business_cards_fts_update
+    AFTER UPDATE OF contact_name, position, email, phone, mobile, detected_text, company_id, city, state, country
+    ON business_cards BEGIN
+        DELETE FROM cards_fts WHERE rowid = old.id;
+        {_INSERT_CARDS} WHERE card.id = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS business_cards_fts_delete AFTER DELETE ON business_cards BEGIN
+        DELETE FROM cards_fts WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS companies_fts_insert AFTER INSERT ON companies BEGIN
+        {_INSERT_COMPANY};
+    END""",
+    # A company's name, industry and location are also indexed with each of its cards
+    f"""CREATE TRIGGER IF NOT EXISTS companies_fts_update
+    AFTER UPDATE OF name, industry, city, state, country ON companies BEGIN
+        DELETE FROM companies_fts WHERE rowid = old.id;
+        {_INSERT_COMPANY};{_REINDEX_COMPANY_CARDS}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS companies_fts_delete AFTER DELETE ON companies BEGIN
+        DELETE FROM companies_fts WHERE rowid = old.id;{_REINDEX_COMPANY_CARDS}
+    END""",
+]
+
+# Refill both indexes from the base tables
+SEARCH_REBUILD = [
+    "DELETE FROM cards_fts",
+    _INSERT_CARDS,
+    "DELETE FROM companies_fts",
+    f"INSERT INTO companies_fts(rowid, {', '.join(COMPANY_SEARCH_COLUMNS)}) "
+    f"SELECT id, name, industry, {_join('city', 'state', 'country')} FROM companies",
+]
+
+def create_search_index(target, connection, **kw):
+    """
+    Create the FTS5 tables and triggers after the schema is created, and
+    fill them from existing rows when they are new (an older database).
+    """
+    if connection.dialect.name != 'sqlite':
+        return
+    existed = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = 'cards_fts'"
+    ).first() is not None
+    for statement in SEARCH_SCHEMA:
+        connection.exec_driver_sql(statement)
+    if not existed:
+        for statement in SEARCH_REBUILD:
+            connection.exec_driver_sql(statement)
+
+event.listen(Base.metadata, 'after_create', create_search_index)
+
+def match_expression(text: str) -> Optional[str]:
+    """
+    FTS5 query for what a user typed: every word must match as a prefix,
+    so "jo smi" finds John Smith. None if there is nothing to search.
+    """
+    terms = re.findall(r'\w+', text or '')
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+_SEARCH_TABLES = {
+    BusinessCard: ('cards_fts', lambda: [
+        BusinessCard.contact_name, BusinessCard.position, BusinessCard.email, BusinessCard.phone,
+        BusinessCard.mobile, BusinessCard.detected_text, Company.name, Company.industry,
+        BusinessCard.city, BusinessCard.country, Company.city, Company.country,
+    ]),
+    Company: ('companies_fts', lambda: [
+        Company.name, Company.industry, Company.city, Company.state, Company.country,
+    ]),
+}
+
+def search(session, model, text: str, limit: Optional[int] = None) -> Optional[Subquery]:
+    """
+    Matches of text among cards (model=BusinessCard) or companies
+    (model=Company) as a subquery of (id, rank), best first by ascending
+    rank. Join it to a query on the model; None means no search terms.
+    When there are more than SEARCH_RANK_WINDOW matches, only the newest
+    ones are ranked and the rest follow them, newest first.
+    """
+    expression = match_expression(text)
+    if expression is None:
+        return None
+    table_name, like_columns = _SEARCH_TABLES[model]
+    if session.bind.dialect.name == 'sqlite':
+        fts = table(table_name, column('rowid'), column('rank'))
+        match = literal_column(table_name).op('MATCH')(expression)
+        # Walking matches in rowid order is cheap; rank from the window's oldest row on
+        oldest = (
+            select(fts.c.rowid).where(match).order_by(fts.c.rowid.desc())
+            .limit(1).offset(SEARCH_RANK_WINDOW - 1).scalar_subquery()
+        )
+        ranked = select(fts.c.rowid.label('id'), fts.c.rank.label('rank')).where(
+            match, fts.c.rowid >= func.coalesce(oldest, 0)
+        )
+        older = select(fts.c.rowid.label('id'), (literal(SEARCH_UNRANKED) - fts.c.rowid).label('rank')).where(
+            match, fts.c.rowid < func.coalesce(oldest, 0)
+        )
+        statement = union_all(ranked, older).order_by(literal_column('rank'))
+    else:
+        # Unranked fallback: every word somewhere in the searchable columns
+        statement = select(model.id.label('id'), literal_column('0').label('rank'))
+        if model is BusinessCard:
+            statement = statement.outerjoin(Company, BusinessCard.company_id == Company.id)
+        for term in re.findall(r'\w+', text):
+            statement = statement.where(or_(*(field.ilike(f"%{term}%") for field in like_columns())))
+    if limit:
+        statement = statement.limit(limit)
+    return statement.subquery()
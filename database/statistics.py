@@ -0,0 +1,165 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import event, func, select
+
+from .models import Base, BusinessCard, Company, Statistic, User
+
+# Dashboard counters in the statistics table, kept up to date by SQLite
+# triggers in the same transaction as every insert, delete or reassignment,
+# so the dashboard reads a handful of rows instead of counting tables.
+# Each counter exists for all users (user_id 0) and per creating user.
+# Other databases have no triggers; there the same numbers are counted live.
+#   cards, companies, users   row counts
+#   cards_by_event            cards per event name ('' for none)
+#   cards_by_day              cards per creation date, YYYY-MM-DD
+
+ALL_USERS = 0
+
+def _bump(name: str, user: str, bucket: str, delta: int) -> str:
+    """SQL adding delta to one counter, creating it at zero first."""
+    return (
+        f"INSERT INTO statistics(name, user_id, bucket, value) VALUES ('{name}', {user}, {bucket}, {delta}) "
+        f"ON CONFLICT(name, user_id, bucket) DO UPDATE SET value = value + {delta};"
+    )
+
+def _card_counters(row: str) -> list:
+    """(name, bucket) of the counters one card counts towards; row is new or old."""
+    return [
+        ('cards', "''"),
+        ('cards_by_event', f"coalesce({row}.event_name, '')"),
+        ('cards_by_day', f"coalesce(date({row}.created_at), '')"),
+    ]
+
+def _bump_card(row: str, delta: int) -> str:
+    user = f"coalesce({row}.created_by_id, -1)"
+    return '\n        '.join(
+        _bump(name, owner, bucket, delta)
+        for name, bucket in _card_counters(row) for owner in (str(ALL_USERS), user)
+    )
+
+def _bump_company(row: str, delta: int) -> str:
+    user = f"coalesce({row}.created_by_id, -1)"
+    return ' '.join(_bump('companies', owner, "''", delta) for owner in (str(ALL_USERS), user))
+
+STATISTICS_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS statistics_business_cards_insert AFTER INSERT ON business_cards BEGIN
+        {_bump_card('new', 1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS statistics_business_cards_delete AFTER DELETE ON business_cards BEGIN
+        {_bump_card('old', -1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS statistics_business_cards_update
+    AFTER UPDATE OF created_by_id, event_name, created_at ON business_cards BEGIN
+        {_bump_card('old', -1)}
+        {_bump_card('new', 1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS statistics_companies_insert AFTER INSERT ON companies BEGIN
+        {_bump_company('new', 1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS statistics_companies_delete AFTER DELETE ON companies BEGIN
+        {_bump_company('old', -1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS statistics_companies_update AFTER UPDATE OF created_by_id ON companies BEGIN
+        {_bump_company('old', -1)} {_bump_company('new', 1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS statistics_users_insert AFTER INSERT ON users BEGIN
+        {_bump('users', str(ALL_USERS), "''", 1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS statistics_users_delete AFTER DELETE ON users BEGIN
+        {_bump('users', str(ALL_USERS), "''", -1)}
+    END""",
+]
+
+def _recount(name: str, table: str, user: str, bucket: str) -> str:
+    """SQL recounting one counter from its table; columns 2 and 3 are the group."""
+    return (f"INSERT INTO statistics(name, user_id, bucket, value) "
+            f"SELECT '{name}', {user}, {bucket}, count(*) FROM {table} GROUP BY 2, 3")
+
+# Recount every counter from the tables
+STATISTICS_REBUILD = ["DELETE FROM statistics"] + [
+    _recount(name, 'business_cards', owner, bucket.replace('row.', ''))
+    for name, bucket in _card_counters('row') for owner in (str(ALL_USERS), "coalesce(created_by_id, -1)")
+] + [
+    _recount('companies', 'companies', owner, "''") for owner in (str(ALL_USERS), "coalesce(created_by_id, -1)")
+] + [
+    _recount('users', 'users', str(ALL_USERS), "''"),
+]
+
+def rebuild_statistics(connection):
+    """Recount every counter, fixing any drift; run inside a transaction."""
+    for statement in STATISTICS_REBUILD:
+        connection.exec_driver_sql(statement)
+
+def create_statistics_triggers(target, connection, **kw):
+    """
+    Install the counter triggers after the schema is created, and count the
+    existing rows when they are new (an older database).
+    """
+    if connection.dialect.name != 'sqlite':
+        return
+    existed = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'statistics_business_cards_insert'"
+    ).first() is not None
+    for statement in STATISTICS_TRIGGERS:
+        connection.exec_driver_sql(statement)
+    if not existed:
+        rebuild_statistics(connection)
+
+event.listen(Base.metadata, 'after_create', create_statistics_triggers)
+
+def read_statistics(session, user_id: Optional[int] = None, days: int = 30, events: int = 10) -> dict:
+    """
+    Counters for one user, or for everyone with user_id None: 'cards',
+    'companies' and 'users' totals, 'cards_by_day' for the last days
+    (oldest first) and the top 'cards_by_event'. A few primary key lookups
+    on SQLite, count queries elsewhere.
+    """
+    first_day = (date.today() - timedelta(days=days - 1)).isoformat()
+    if session.bind.dialect.name != 'sqlite':
+        return _count_statistics(session, user_id, first_day, events)
+    owner = ALL_USERS if user_id is None else user_id
+    rows = session.execute(
+        select(Statistic.name, Statistic.value)
+        .where(Statistic.name.in_(['cards', 'companies', 'users']),
+               Statistic.user_id == owner, Statistic.bucket == '')
+    ).all()
+    totals = {'cards': 0, 'companies': 0, 'users': 0, **dict(rows)}
+    totals['cards_by_day'] = dict(session.execute(
+        select(Statistic.bucket, Statistic.value)
+        .where(Statistic.name == 'cards_by_day', Statistic.user_id == owner,
+               Statistic.bucket >= first_day, Statistic.value > 0)
+        .order_by(Statistic.bucket)
+    ).all())
+    totals['cards_by_event'] = dict(session.execute(
+        select(Statistic.bucket, Statistic.value)
+        .where(Statistic.name == 'cards_by_event', Statistic.user_id == owner, Statistic.value > 0)
+        .order_by(Statistic.value.desc()).limit(events)
+    ).all())
+    return totals
+
+def _count_statistics(session, user_id: Optional[int], first_day: str, events: int) -> dict:
+    """read_statistics from the tables themselves, for databases without the triggers."""
+    cards = select(BusinessCard)
+    companies = select(Company)
+    if user_id is not None:
+        cards = cards.where(BusinessCard.created_by_id == user_id)
+        companies = companies.where(Company.created_by_id == user_id)
+    cards = cards.subquery()
+    day = func.date(cards.c.created_at)
+    event_name = func.coalesce(cards.c.event_name, '')
+    return {
+        'cards': session.scalar(select(func.count()).select_from(cards)),
+        'companies': session.scalar(select(func.count()).select_from(companies.subquery())),
+        'users': session.scalar(select(func.count()).select_from(User)) if user_id is None else 0,
+        'cards_by_day': {
+            str(bucket): value for bucket, value in session.execute(
+                select(day, func.count()).where(cards.c.created_at >= first_day)
+                .group_by(day).order_by(day)
+            ).all()
+        },
+        'cards_by_event': dict(session.execute(
+            select(event_name, func.count()).group_by(event_name)
+            .order_by(func.count().desc()).limit(events)
+        ).all()),
+    }
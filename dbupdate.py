@@ -1,15 +1,44 @@
-import sqlite3
+from sqlalchemy import inspect, text
+
+from database.db import db
+from database.models import Base
+
+# Columns added after the first release, as (table, column, SQL type)
+NEW_COLUMNS = [
+    # Add requester column to requests table if it doesn't exist
+    ('requests', 'timestamp', 'TEXT'),
+    # Per-line OCR output of region-based scanning
+    ('business_cards', 'ocr_lines', 'JSON'),
+    # Upload size before recompression
+    ('blobs', 'original_size', 'INTEGER'),
+]
 
 def update_schema():
-    conn = sqlite3.connect('cardsnap.db')
-    c = conn.cursor()
-    try:
-        # Add requester column to requests table if it doesn't exist
-        c.execute("ALTER TABLE requests ADD COLUMN timestamp TEXT")
-    except sqlite3.OperationalError:
-        # Column already exists
-        pass
-    conn.commit()
-    conn.close()
+    """Add the columns an existing database is missing, on the configured database."""
+    inspector = inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    with db.engine.begin() as connection:
+        for table, column, type_ in NEW_COLUMNS:
+            if table not in tables:
+                # init_db creates the table with the column
+                continue
+            if column in {existing['name'] for existing in inspector.get_columns(table)}:
+                continue
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {type_}"))
+
+def create_indexes():
+    """Build the indexes declared in database/models.py on an existing database."""
+    tables = set(inspect(db.engine).get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            # init_db creates missing tables together with their indexes
+            continue
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+    if db.engine.dialect.name in ('sqlite', 'postgresql'):
+        # Give the query planner statistics for the new indexes
+        with db.engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
 
 update_schema()
+create_indexes()
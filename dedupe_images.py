@@ -0,0 +1,89 @@
+import argparse
+import os
+import sys
+
+from sqlalchemy import select, update
+
+from database.db import db
+from database.models import Blob, BusinessCard, CardJob, Company
+from utils.blob_store import blob_store, recount_references
+from utils.recompress import sniff_extension
+
+# Columns holding image paths; card jobs are moved too so unsaved scans keep their image
+PATH_COLUMNS = (BusinessCard.image_path, Company.logo_path, CardJob.image_path)
+
+def local_path(path: str) -> str:
+    """Stored paths may have been written on Windows; use this platform's separator."""
+    return os.path.normpath(path.replace('\\', '/'))
+
+def store_root(path: str) -> str:
+    """Store a legacy file belongs to: its top-level directory, e.g. uploads or company_logos."""
+    parts = local_path(path).split(os.sep)
+    return parts[0] if len(parts) > 1 else "uploads"
+
+def migrate(dry_run: bool, keep_originals: bool):
+    """Move every referenced legacy image into the blob store, collapsing duplicates."""
+    with db.get_session() as session:
+        referenced = set()
+        for column in PATH_COLUMNS:
+            referenced.update(session.execute(select(column).where(column.isnot(None)).distinct()).scalars())
+        stored = set(session.execute(select(Blob.path)).scalars())
+
+    legacy = sorted(referenced - stored)
+    moved, missing = {}, []
+    digests, total_bytes, unique_bytes = set(), 0, 0
+    for path in legacy:
+        try:
+            with open(local_path(path), 'rb') as f:
+                data = f.read()
+        except OSError:
+            missing.append(path)
+            continue
+        store = blob_store(store_root(path))
+        digest = store.digest(data)
+        try:
+            # Older uploads were all named .png whatever their format
+            extension = sniff_extension(data)
+        except Exception:
+            extension = os.path.splitext(path)[1].lstrip('.').lower() or "png"
+        total_bytes += len(data)
+        if (store.root, digest) not in digests:
+            digests.add((store.root, digest))
+            unique_bytes += len(data)
+        moved[path] = store.path_for(digest, extension) if dry_run else store.put(data, extension, digest)
+
+    print(f"{len(legacy)} legacy files referenced, {len(digests)} distinct, "
+          f"{(total_bytes - unique_bytes) / 1024:.0f} KB of duplicates")
+    for path in missing:
+        print(f"  missing: {path}")
+    if dry_run or not moved:
+        return
+
+    # Core updates skip the ref_count listeners; the counts are rebuilt below
+    with db.get_session() as session:
+        for column in PATH_COLUMNS:
+            for old_path, new_path in moved.items():
+                session.execute(update(column.class_).where(column == old_path).values({column.key: new_path}))
+    recount_references()
+
+    if not keep_originals:
+        for old_path in moved:
+            if os.path.exists(local_path(old_path)):
+                os.remove(local_path(old_path))
+    print(f"Moved {len(moved)} references into the blob store")
+
+def main():
+    """Collapse duplicate uploads and logos into the content-addressed blob store."""
+    parser = argparse.ArgumentParser(description="Migrate stored images into the content-addressed store.")
+    parser.add_argument("--dry-run", action="store_true", help="Report duplicates without changing anything")
+    parser.add_argument("--keep-originals", action="store_true", help="Leave the legacy files in place")
+    args = parser.parse_args()
+
+    try:
+        migrate(args.dry_run, args.keep_originals)
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
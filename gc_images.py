@@ -0,0 +1,191 @@
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+from sqlalchemy import and_, delete, or_, select
+
+from database.db import db
+from database.models import Blob, CardJob
+from dedupe_images import PATH_COLUMNS, local_path
+from utils.thumbnails import is_thumbnail
+
+# Directories images are stored in
+STORAGE_DIRECTORIES = ("uploads", "company_logos")
+# Blob rows deleted per statement
+DELETE_CHUNK_SIZE = 500
+# Extra conditions for a path column to count as a live reference. A card
+# job only holds its image while it can still become a card; once saved,
+# the card holds it, and failed or superseded jobs hold nothing.
+LIVE_REFERENCES = {
+    CardJob.image_path: or_(
+        CardJob.status.in_(('queued', 'running')),
+        and_(CardJob.status == 'done', CardJob.card_id.is_(None)),
+    ),
+}
+
+def referenced_paths() -> dict:
+    """
+    Stream every image path the database points at into a dict of
+    local path -> referencing columns. Card jobs count while they are
+    pending or unsaved (see LIVE_REFERENCES), so unsaved scans keep their image.
+    """
+    referenced = defaultdict(list)
+    with db.get_session() as session:
+        for column in PATH_COLUMNS:
+            name = f"{column.class_.__tablename__}.{column.key}"
+            query = select(column).where(column.isnot(None))
+            if column in LIVE_REFERENCES:
+                query = query.where(LIVE_REFERENCES[column])
+            rows = session.execute(query.distinct().execution_options(yield_per=1000)).scalars()
+            for path in rows:
+                referenced[local_path(path)].append(name)
+    return referenced
+
+def walk_files(directory: str):
+    """Yield (path, mtime) of every file below directory, using os.scandir without recursion."""
+    pending = [directory]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield os.path.normpath(entry.path), entry.stat().st_mtime
+
+def _original_stem(path: str) -> str:
+    """Stem of the image a thumbnail was made from: <stem>.thumb-<px>.<ext> -> <stem>."""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, name.split('.thumb-')[0])
+
+def find_orphans(directories, grace_seconds: float) -> dict:
+    """
+    Compare storage with the database in one pass over the files. Returns
+    'orphans' (unreferenced files older than the grace period), 'dangling'
+    (referenced paths without a file, with their columns), 'stale_blobs'
+    (unreferenced blobs rows without a file), 'young' and 'scanned' counts.
+    Thumbnails live as long as their original is referenced.
+    """
+    referenced = referenced_paths()
+    referenced_stems = {os.path.splitext(path)[0] for path in referenced}
+    cutoff = time.time() - grace_seconds
+    seen = set()
+    orphans, young, scanned = [], 0, 0
+    for directory in directories:
+        for path, mtime in walk_files(directory):
+            scanned += 1
+            seen.add(path)
+            if is_thumbnail(path):
+                in_use = _original_stem(path) in referenced_stems
+            else:
+                in_use = path in referenced
+            if in_use:
+                continue
+            if mtime > cutoff:
+                # Possibly an upload whose row is not committed yet
+                young += 1
+            else:
+                orphans.append(path)
+
+    roots = tuple(os.path.normpath(directory) + os.sep for directory in directories)
+    dangling = {
+        path: columns for path, columns in referenced.items()
+        if path not in seen and (path.startswith(roots) or not os.path.exists(path))
+    }
+    with db.get_session() as session:
+        # ref_count does not include card jobs, so the referenced set decides
+        stale_blobs = [
+            path for path in session.execute(
+                select(Blob.path).where(Blob.ref_count == 0).execution_options(yield_per=1000)
+            ).scalars()
+            if local_path(path).startswith(roots) and local_path(path) not in seen
+            and local_path(path) not in referenced
+        ]
+    return {'orphans': orphans, 'dangling': dangling, 'stale_blobs': stale_blobs,
+            'young': young, 'scanned': scanned}
+
+def quarantine_target(path: str, quarantine_dir: str) -> str:
+    """
+    Where path goes under quarantine_dir, keeping its directories. Absolute
+    paths lose their drive and root, so they cannot escape quarantine_dir.
+    """
+    relative = os.path.normpath(os.path.splitdrive(path)[1]).lstrip(os.sep + (os.altsep or ''))
+    root = os.path.abspath(quarantine_dir)
+    target = os.path.abspath(os.path.join(root, relative))
+    if (not relative or relative.startswith(os.pardir) or os.path.commonpath([root, target]) != root
+            or target == os.path.abspath(path)):
+        raise ValueError(f"{path} would not be quarantined under {quarantine_dir}")
+    return target
+
+def collect(orphans: list, stale_blobs: list, quarantine_dir: str = None) -> list:
+    """
+    Delete (or move under quarantine_dir) the orphaned files, then drop the
+    blobs rows of those files and of blobs whose file is already gone.
+    """
+    removed = []
+    for path in orphans:
+        try:
+            if quarantine_dir:
+                target = quarantine_target(path, quarantine_dir)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(path, target)
+            else:
+                os.remove(path)
+            removed.append(path)
+        except (OSError, ValueError) as e:
+            print(f"  could not remove {path}: {e}")
+
+    # Blob paths were written with this platform's separator
+    blob_paths = removed + stale_blobs
+    with db.get_session() as session:
+        for start in range(0, len(blob_paths), DELETE_CHUNK_SIZE):
+            chunk = blob_paths[start:start + DELETE_CHUNK_SIZE]
+            session.execute(delete(Blob).where(Blob.path.in_(chunk)))
+    return removed
+
+def main():
+    """Find unreferenced image files and references to missing files."""
+    parser = argparse.ArgumentParser(description="Garbage-collect orphaned images and check storage consistency.")
+    parser.add_argument("directories", nargs="*", default=list(STORAGE_DIRECTORIES),
+                        help=f"Storage directories to scan (default: {' '.join(STORAGE_DIRECTORIES)})")
+    parser.add_argument("--grace-hours", type=float, default=24.0,
+                        help="Leave unreferenced files younger than this alone (default: 24)")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--delete", action="store_true", help="Delete orphaned files")
+    action.add_argument("--quarantine", metavar="DIR", default=None,
+                        help="Move orphaned files under DIR instead of deleting them")
+    args = parser.parse_args()
+
+    try:
+        started = time.perf_counter()
+        report = find_orphans(args.directories, args.grace_hours * 3600)
+        orphans = report['orphans']
+        orphan_bytes = sum(os.path.getsize(path) for path in orphans)
+        print(f"Scanned {report['scanned']} files in {time.perf_counter() - started:.1f}s: "
+              f"{len(orphans)} orphaned ({orphan_bytes / 1048576:.1f} MB), "
+              f"{report['young']} unreferenced but within the grace period")
+
+        print(f"{len(report['dangling'])} references to missing files")
+        for path, columns in sorted(report['dangling'].items()):
+            print(f"  {path} ({', '.join(columns)})")
+        print(f"{len(report['stale_blobs'])} unreferenced blobs rows without a file")
+
+        if args.delete or args.quarantine:
+            removed = collect(orphans, report['stale_blobs'], args.quarantine)
+            verb = f"Moved to {args.quarantine}" if args.quarantine else "Deleted"
+            print(f"{verb}: {len(removed)} files")
+        elif orphans:
+            for path in orphans:
+                print(f"  orphan: {path}")
+            print("Dry run; pass --delete or --quarantine DIR to collect them")
+    except Exception as e:
+        print(f"Error during garbage collection: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
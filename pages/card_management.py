@@ -1,23 +1,49 @@
 import streamlit as st
 from database.db import db
 from database.models import BusinessCard, Company
-from utils.scanner import Scanner
+from database.repository import company_names
+from database.search import search
+from utils.scanner import Scanner, ScanJob
+from utils.ingest import CardIngestor, derived_columns
+from utils.jobs import card_jobs
+from utils.blob_store import blob_store
+from utils.thumbnails import thumbnail_path
 from utils.auth import login_required, role_required
 from datetime import datetime
-import io
-from PIL import Image
-from sqlalchemy import or_
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import defer, joinedload
 import pytesseract
 
 # Configure pytesseract path
 pytesseract.pytesseract.tesseract_cmd = r'C:\\Program Files\\Tesseract-OCR\\tesseract.exe'
 
+# Page sizes offered in "View Cards" and the default
+CARD_PAGE_SIZES = [10, 20, 50, 100]
+CARD_PAGE_SIZE = 20
+
+def _job_progress(job_id: int):
+    """Show a pending card job; the whole page reruns once it has finished."""
+    job = card_jobs.get(job_id)
+    if job is None or job.status in ('done', 'failed'):
+        st.rerun()
+    st.info("Waiting for a free worker..." if job.status == 'queued' else "Processing...")
+    st.button("Refresh status")
+
+# Poll in a fragment so only the status box reruns while the job is pending
+if hasattr(st, 'fragment'):
+    render_job_progress = st.fragment(run_every=1)(_job_progress)
+else:
+    render_job_progress = _job_progress
+
 @login_required
 def render_card_management():
     """Render the card management page."""
     st.title("Card Management")
     
-    tab1, tab2 = st.tabs(["Add Card", "View Cards"])
+    # Resume jobs left queued by a previous server run
+    card_jobs.start()
+    
+    tab1, tab2, tab3 = st.tabs(["Add Card", "Batch Upload", "View Cards"])
     
     with tab1:
         st.header("Add New Business Card")
@@ -34,283 +60,444 @@ def render_card_management():
         website = None
         event_name = None
         
+        raw_text = ""
+        parsed_info = None
+        qr_code_data = None
+        ocr_lines = None
+        job = None
+        
         if uploaded_file is not None:
-            # Initialize raw_text to an empty string to avoid referencing before assignment
-            raw_text = ""
+            img_byte_arr = uploaded_file.getvalue()
+            
+            # Decode the upload once for the preview
+            scan_job = st.session_state.get('scan_job')
+            if scan_job is None or scan_job.image_bytes != img_byte_arr:
+                scan_job = ScanJob(img_byte_arr)
+                st.session_state.scan_job = scan_job
+            
             # Display the uploaded image
-            image = Image.open(uploaded_file)
-            st.image(image, caption='Uploaded Business Card', use_container_width=True)
+            st.image(scan_job.image, caption='Uploaded Business Card', use_container_width=True)
+            
+            # Uploads are stored by content hash, so a re-upload is one indexed lookup
+            stored_blob = blob_store("uploads").find(scan_job.digest)
+            if stored_blob is not None and stored_blob.ref_count:
+                st.info("This image has already been saved with another card.")
+            
+            line_ocr = st.checkbox(
+                "Line-level OCR",
+                help="OCR text blocks in parallel and pick fields by confidence"
+            )
             
-            # Process button
+            # Process button: OCR and QR scanning run in a background job, not in this script run
             if st.button("Process Card"):
-                with st.spinner("Processing..."):
+                try:
+                    st.session_state.card_job_id = card_jobs.submit(
+                        img_byte_arr, st.session_state.user_id, {'line_ocr': line_ocr}
+                    )
+                except Exception as e:
+                    st.error(f"Error processing card: {str(e)}")
+            
+            job_id = st.session_state.get('card_job_id')
+            job = card_jobs.get(job_id) if job_id else None
+            if job is not None and job.image_digest != scan_job.digest:
+                job = None
+        else:
+            # Scans processed before a page reload or restart can still be reviewed and saved
+            pending_jobs = card_jobs.unsaved(st.session_state.user_id)
+            if pending_jobs:
+                jobs_by_id = {pending.id: pending for pending in pending_jobs}
+                job_id = st.selectbox(
+                    "Or continue with a processed scan",
+                    [None] + list(jobs_by_id),
+                    format_func=lambda i: "—" if i is None else
+                        f"{jobs_by_id[i].created_at:%Y-%m-%d %H:%M} - "
+                        f"{(jobs_by_id[i].result.get('parsed_info') or {}).get('name') or 'Unknown Contact'}"
+                )
+                if job_id:
+                    job = jobs_by_id[job_id]
+                    st.session_state.card_job_id = job_id
                     try:
-                        # Get image bytes
-                        img_byte_arr = uploaded_file.getvalue()
-                        
-                        # Extract text and parse information
-                        raw_text, parsed_info = Scanner.extract_text_from_image(img_byte_arr)
-                        
-                        # Display results in columns
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.subheader("Extracted Information")
-                            company_name = st.text_input("Company Name (Optional)", value=parsed_info.get('company', ''))
-                            contact_name = st.text_input("Contact Name (Optional)", value=parsed_info.get('name', ''))
-                            position = st.text_input("Position", value=parsed_info.get('position', ''))
-                            email = st.text_input("Email", value=parsed_info.get('email', ''))
-                            phone = st.text_input("Phone", value=parsed_info.get('phone', ''))
-                            website = st.text_input("Website", value=parsed_info.get('website', ''))
-                            event_name = st.text_input("Event Name (Optional)")
-                        
-                        with col2:
-                            st.subheader("Raw Text")
-                            st.text_area("Detected Text", value=raw_text, height=300)
-                            
-                    except Exception as e:
-                        st.error(f"Error processing card: {str(e)}")
+                        st.image(job.image_path, caption='Business Card', use_container_width=True)
+                    except Exception:
+                        st.warning("Image file not found")
+        
+        if job is not None:
+            if job.status in ('queued', 'running'):
+                render_job_progress(job.id)
+            elif job.status == 'failed':
+                st.error(f"Error processing card: {job.error}")
+            else:
+                result = job.result
+                raw_text = result['raw_text']
+                parsed_info = result['parsed_info']
+                qr_code_data = result['qr_code_data']
+                ocr_lines = result['ocr_lines']
+                for warning in result.get('warnings', []):
+                    st.warning(warning)
+                
+                # Display results in columns
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.subheader("Extracted Information")
+                    company_name = st.text_input("Company Name (Optional)", value=parsed_info.get('company', ''))
+                    contact_name = st.text_input("Contact Name (Optional)", value=parsed_info.get('name', ''))
+                    position = st.text_input("Position", value=parsed_info.get('position', ''))
+                    email = st.text_input("Email", value=parsed_info.get('email', ''))
+                    phone = st.text_input("Phone", value=parsed_info.get('phone', ''))
+                    website = st.text_input("Website", value=parsed_info.get('website', ''))
+                    event_name = st.text_input("Event Name (Optional)")
+                
+                with col2:
+                    st.subheader("Raw Text")
+                    if qr_code_data and not raw_text:
+                        st.info("Details were read from the card's QR code.")
+                        if st.button("Run OCR"):
+                            try:
+                                st.session_state.card_job_id = card_jobs.resubmit(job, {'force_ocr': True})
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"Error processing card: {str(e)}")
+                    st.text_area("Detected Text", value=raw_text, height=300)
+                    if ocr_lines:
+                        st.caption("Detected lines")
+                        st.dataframe(
+                            [{'Text': line['text'], 'Confidence': line['confidence']} for line in ocr_lines],
+                            use_container_width=True
+                        )
         
         # Save button
         if st.button("Save Card"):
-            try:
-                with db.get_session() as session:
-                    # Ensure raw_text is extracted if not already done
-                    if uploaded_file:
-                        try:
-                            raw_text
-                        except NameError:
-                            raw_text = ""
-                        if raw_text == "":
-                            raw_text, parsed_info = Scanner.extract_text_from_image(uploaded_file.getvalue())
-                    else:
-                        raw_text = ""
-                        parsed_info = None
-                    
-                    # Create or get company if company name is provided
-                    company_id = None
-                    if company_name:
-                        company = session.query(Company).filter(Company.name == company_name).first()
-                        if not company:
-                            company = Company(
-                                name=company_name,
-                                website=website,
-                                created_by_id=st.session_state.user_id
-                            )
-                            session.add(company)
-                            session.flush()  # Get company ID
-                        company_id = company.id
-                    
-                    # Create new business card with raw detected text and parsed data
-                    card = BusinessCard(
-                        company_id=company_id,
-                        contact_name=contact_name if contact_name else None,
-                        position=position if position else None,
-                        email=email if email else None,
-                        phone=phone if phone else None,
-                        website=website if website else None,
-                        event_name=event_name if event_name else None,
-                        created_by_id=st.session_state.user_id,
-                        created_at=datetime.utcnow(),
-                        detected_text=raw_text,
-                        parsed_data=parsed_info if 'parsed_info' in locals() else None,
-                        qr_code_data=None  # Will be set below if QR code is detected
-                    )
-                    
-                    # Extract additional information from parsed_info if available
-                    if 'parsed_info' in locals() and parsed_info:
-                        card.mobile = parsed_info.get('mobile')
-                        card.fax = parsed_info.get('fax')
-                        card.street_address = parsed_info.get('address')
-                        card.city = parsed_info.get('city')
-                        card.state = parsed_info.get('state')
-                        card.postal_code = parsed_info.get('postal_code')
-                        card.country = parsed_info.get('country')
-                        card.department = parsed_info.get('department')
-                        card.social_linkedin = parsed_info.get('linkedin')
-                        card.social_twitter = parsed_info.get('twitter')
-                        card.social_facebook = parsed_info.get('facebook')
-                        card.notes = parsed_info.get('notes')
-                    
-                    if uploaded_file:
-                        # Save image
-                        img_byte_arr = uploaded_file.getvalue()
+            if uploaded_file and (job is None or job.status != 'done'):
+                # Saving no longer runs OCR inline; queue the card and save once it is processed
+                if job is None:
+                    try:
+                        st.session_state.card_job_id = card_jobs.submit(
+                            uploaded_file.getvalue(), st.session_state.user_id, {'line_ocr': line_ocr}
+                        )
+                    except Exception as e:
+                        st.error(f"Error processing card: {str(e)}")
+                if job is None or job.status != 'failed':
+                    st.info("The card is still being processed. Save it once the details appear.")
+            else:
+                try:
+                    with db.get_session() as session:
+                        # Create or get company if company name is provided
+                        company_id = None
+                        if company_name:
+                            company = session.query(Company).filter(Company.name == company_name).first()
+                            if not company:
+                                company = Company(
+                                    name=company_name,
+                                    website=website,
+                                    created_by_id=st.session_state.user_id
+                                )
+                                session.add(company)
+                                session.flush()  # Get company ID
+                            company_id = company.id
                         
-                        # Try to detect QR code
-                        try:
-                            qr_data = Scanner.scan_qr_code(img_byte_arr)
-                            if qr_data:
-                                card.qr_code_data = qr_data
-                        except Exception as e:
-                            st.warning(f"Could not scan QR code: {str(e)}")
+                        # Create new business card with raw detected text and parsed data
+                        card = BusinessCard(
+                            company_id=company_id,
+                            contact_name=contact_name if contact_name else None,
+                            position=position if position else None,
+                            email=email if email else None,
+                            phone=phone if phone else None,
+                            website=website if website else None,
+                            event_name=event_name if event_name else None,
+                            created_by_id=st.session_state.user_id,
+                            created_at=datetime.utcnow(),
+                            detected_text=raw_text,
+                            parsed_data=parsed_info,
+                            ocr_lines=ocr_lines,
+                            qr_code_data=qr_code_data,
+                            # The job stored the upload when it was queued
+                            image_path=job.image_path if job else None
+                        )
                         
-                        # Save image file
-                        image_path = Scanner.save_image(img_byte_arr)
-                        card.image_path = image_path
+                        # Extract additional information from parsed_info if available
+                        if parsed_info:
+                            for column, value in derived_columns(parsed_info).items():
+                                setattr(card, column, value)
+                        
+                        session.add(card)
+                        session.flush()
+                        if job:
+                            card_jobs.mark_saved(session, job.id, card.id)
                     
-                    session.add(card)
-                    session.commit()
+                    st.session_state.pop('card_job_id', None)
+                    st.session_state.pop('scan_job', None)
+                    st.success("Business card saved successfully!")
+                    st.rerun()  # Refresh the page to show updated data
                     
-                st.success("Business card saved successfully!")
-                st.rerun()  # Refresh the page to show updated data
-                
-            except Exception as e:
-                st.error(f"Error saving business card: {str(e)}")
+                except Exception as e:
+                    st.error(f"Error saving business card: {str(e)}")
     
     with tab2:
-        st.header("View Business Cards")
+        render_batch_upload_tab()
+    
+    with tab3:
+        render_view_cards_tab()
+
+def _estimated_card_count(session) -> int:
+    """
+    Number of cards without counting them: the highest id is an index
+    lookup and only overstates the count by the cards deleted.
+    """
+    return session.query(func.max(BusinessCard.id)).scalar() or 0
+
+def _card_page(query, sort_columns: list, descending: bool, cursor, page_size: int):
+    """
+    One page of a card query in keyset order: the cards sorting after cursor
+    (the sort key of the previous page's last card), and the cursor of the
+    next page, or None on the last page. Seeking on an index instead of
+    skipping rows keeps every page equally fast.
+    """
+    if cursor is not None:
+        key = tuple_(*sort_columns)
+        query = query.filter(key < tuple_(*cursor) if descending else key > tuple_(*cursor))
+    order = [column.desc() if descending else column.asc() for column in sort_columns]
+    rows = query.add_columns(*sort_columns).order_by(*order).limit(page_size + 1).all()
+    next_cursor = tuple(rows[page_size - 1][1:]) if len(rows) > page_size else None
+    return [row[0] for row in rows[:page_size]], next_cursor
+
+def render_view_cards_tab():
+    """Render the card list one page at a time."""
+    st.header("View Business Cards")
+    
+    # Search filters
+    search_col1, search_col2, search_col3 = st.columns([2, 2, 1])
+    with search_col1:
+        search_query = st.text_input("Search by name, company, email, phone or card text")
+    with search_col2:
+        with db.get_session() as session:
+            companies = company_names(session)
+        company_filter = st.selectbox("Filter by Company", ["All Companies"] + companies)
+    with search_col3:
+        page_size = st.selectbox("Cards per page", CARD_PAGE_SIZES, index=CARD_PAGE_SIZES.index(CARD_PAGE_SIZE))
+    
+    # Start cursors of the pages up to the current one; a new filter starts over
+    filters = (search_query, company_filter, page_size)
+    if st.session_state.get('card_page_filters') != filters:
+        st.session_state.card_page_filters = filters
+        st.session_state.card_page_cursors = [None]
+    cursors = st.session_state.card_page_cursors
+    
+    with db.get_session() as session:
+        # The company is shown on every card; the bulky text columns load when a card is expanded
+        query = session.query(BusinessCard).options(
+            joinedload(BusinessCard.company),
+            defer(BusinessCard.detected_text), defer(BusinessCard.parsed_data), defer(BusinessCard.ocr_lines)
+        )
+        if company_filter != "All Companies":
+            query = query.join(Company).filter(Company.name == company_filter)
         
-        # Search filters
-        search_col1, search_col2 = st.columns(2)
-        with search_col1:
-            search_query = st.text_input("Search by company or contact name")
-        with search_col2:
-            with db.get_session() as session:
-                companies = session.query(Company).all()
-                company_filter = st.selectbox(
-                    "Filter by Company",
-                    ["All Companies"] + [company.name for company in companies]
-                )
+        matches = search(session, BusinessCard, search_query)
+        if matches is not None:
+            # Best matches first
+            query = query.join(matches, BusinessCard.id == matches.c.id)
+            sort_columns, descending = [matches.c.rank, BusinessCard.id], False
+        else:
+            sort_columns, descending = [BusinessCard.created_at, BusinessCard.id], True
+        cards, next_cursor = _card_page(query, sort_columns, descending, cursors[-1], page_size)
         
-        # Get cards with filters
-        with db.get_session() as session:
-            # Use joinedload to eagerly load the company relationship
-            from sqlalchemy.orm import joinedload
-            query = session.query(BusinessCard).options(joinedload(BusinessCard.company))
-            
-            if company_filter != "All Companies":
-                query = query.join(Company).filter(Company.name == company_filter)
-            
-            if search_query:
-                query = query.outerjoin(Company).filter(
-                    or_(
-                        Company.name.ilike(f"%{search_query}%"),
-                        BusinessCard.contact_name.ilike(f"%{search_query}%")
-                    )
-                )
-            
-            # Execute query and get all results within the session
-            cards = query.order_by(BusinessCard.created_at.desc()).all()
+        page = len(cursors)
+        if matches is None and company_filter == "All Companies":
+            total = _estimated_card_count(session)
+            st.caption(f"Page {page} of about {max(1, -(-total // page_size))} (~{total} cards)")
+        else:
+            st.caption(f"Page {page}")
+        if not cards:
+            st.info("No business cards found.")
+        
+        for card in cards:
+            company_name = card.company.name if card.company else "Unknown Company"
+            contact_name = card.contact_name if card.contact_name else "Unknown Contact"
             
-            # Display cards
-            for card in cards:
-                company_name = card.company.name if card.company else "Unknown Company"
-                contact_name = card.contact_name if card.contact_name else "Unknown Contact"
-                
-                st.markdown("---")  # Add a separator between cards
+            st.markdown("---")  # Add a separator between cards
+            summary_col1, summary_col2 = st.columns([1, 4])
+            with summary_col1:
+                if card.image_path:
+                    try:
+                        st.image(thumbnail_path(card.image_path, 'small'), use_container_width=True)
+                    except Exception:
+                        st.warning("Image file not found")
+            with summary_col2:
                 st.subheader(f"{company_name} - {contact_name}")
-                
-                col1, col2, col3 = st.columns([1, 1, 1])
-                
-                with col1:
-                    if card.image_path:
-                        try:
-                            image = Image.open(card.image_path)
-                            st.image(image, caption="Business Card Image", use_container_width=True)
-                        except Exception:
-                            st.warning("Image file not found")
-                
-                with col2:
-                    st.subheader("Contact Information")
-                    if card.contact_name:
-                        st.write(f"**Contact:** {card.contact_name}")
-                    if card.position:
-                        st.write(f"**Position:** {card.position}")
-                    if card.email:
-                        st.write(f"**Email:** {card.email}")
-                    if card.phone:
-                        st.write(f"**Phone:** {card.phone}")
-                    if card.company:
-                        st.write(f"**Company:** {company_name}")
-                        if card.company.website:
-                            st.write(f"**Website:** {card.company.website}")
-                    
-                    # Add View More Info button with toggle
-                    show_info = st.checkbox("View More Info", key=f"more_info_{card.id}")
-                    if show_info:
-                        st.markdown("##### Raw Detected Text")
-                        st.text_area("Raw Text", value=card.detected_text, height=300, key=f"raw_text_{card.id}", disabled=True)
-                        st.markdown("##### Card Details")
-                        card_details = {
-                            "id": card.id,
-                            "Company": card.company.name if card.company else None,
-                            "Contact Name": card.contact_name,
-                            "Position": card.position,
-                            "Email": card.email,
-                            "Phone": card.phone,
-                            "Website": card.website,
-                            "Event Name": card.event_name,
-                            "Created At": card.created_at.strftime('%Y-%m-%d %H:%M:%S') if card.created_at else None,
-                            "Parsed Data": card.parsed_data
-                        }
-                        st.json(card_details) #you can delete it if you want 
-                    
-                    if card.event_name:
-                        st.write(f"**Event:** {card.event_name}")
-                    st.write(f"**Created:** {card.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
+                st.caption(" · ".join(filter(None, [
+                    card.position, card.email, card.phone,
+                    card.created_at.strftime('%Y-%m-%d %H:%M') if card.created_at else None
+                ])))
+                # Images, QR codes and raw text are only built for expanded cards
+                expanded = st.toggle("Details", key=f"card_details_{card.id}")
+            if expanded:
+                _render_card_details(card, company_name)
+        
+        prev_col, _, next_col = st.columns([1, 4, 1])
+        with prev_col:
+            if st.button("← Previous", disabled=page == 1):
+                cursors.pop()
+                st.rerun()
+        with next_col:
+            if st.button("Next →", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
+
+def _render_card_details(card: BusinessCard, company_name: str):
+    """Full view of one card: image, contact details, actions and QR codes."""
+    col1, col2, col3 = st.columns([1, 1, 1])
+    
+    with col1:
+        if card.image_path:
+            try:
+                # The list only sends thumbnails; the original loads on demand
+                st.image(thumbnail_path(card.image_path), caption="Business Card Image",
+                         use_container_width=True)
+                if st.toggle("Full image", key=f"full_image_{card.id}"):
+                    st.image(card.image_path, use_container_width=True)
+            except Exception:
+                st.warning("Image file not found")
+    
+    with col2:
+        st.subheader("Contact Information")
+        if card.contact_name:
+            st.write(f"**Contact:** {card.contact_name}")
+        if card.position:
+            st.write(f"**Position:** {card.position}")
+        if card.email:
+            st.write(f"**Email:** {card.email}")
+        if card.phone:
+            st.write(f"**Phone:** {card.phone}")
+        if card.company:
+            st.write(f"**Company:** {company_name}")
+            if card.company.website:
+                st.write(f"**Website:** {card.company.website}")
+        
+        # Add View More Info button with toggle
+        show_info = st.checkbox("View More Info", key=f"more_info_{card.id}")
+        if show_info:
+            st.markdown("##### Raw Detected Text")
+            st.text_area("Raw Text", value=card.detected_text, height=300, key=f"raw_text_{card.id}", disabled=True)
+            st.markdown("##### Card Details")
+            card_details = {
+                "id": card.id,
+                "Company": card.company.name if card.company else None,
+                "Contact Name": card.contact_name,
+                "Position": card.position,
+                "Email": card.email,
+                "Phone": card.phone,
+                "Website": card.website,
+                "Event Name": card.event_name,
+                "Created At": card.created_at.strftime('%Y-%m-%d %H:%M:%S') if card.created_at else None,
+                "Parsed Data": card.parsed_data
+            }
+            st.json(card_details) #you can delete it if you want 
+        
+        if card.event_name:
+            st.write(f"**Event:** {card.event_name}")
+        st.write(f"**Created:** {card.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        if st.session_state.user_role == "Admin":
+            if st.button("Delete", key=f"delete_{card.id}"):
+                try:
+                    with db.get_session() as session:
+                        card_to_delete = session.query(BusinessCard).get(card.id)
+                        card_jobs.forget_card(session, card.id)
+                        session.delete(card_to_delete)
+                        session.commit()
                     
-                    if st.session_state.user_role == "Admin":
-                        if st.button("Delete", key=f"delete_{card.id}"):
-                            try:
-                                with db.get_session() as session:
-                                    card_to_delete = session.query(BusinessCard).get(card.id)
-                                    session.delete(card_to_delete)
-                                    session.commit()
-                                
-                                st.success("Card deleted successfully!")
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"Error deleting card: {str(e)}")
+                    st.success("Card deleted successfully!")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error deleting card: {str(e)}")
+    
+    with col3:
+        st.subheader("QR Codes")
+        
+        # Business Card QR Code from Raw Text
+        if card.detected_text:
+            try:
+                qr_image_bytes, _ = Scanner.generate_qr_code({
+                    'raw_text': card.detected_text,
+                    'type': 'business_card'
+                }, version=card.updated_at)
+                st.image(qr_image_bytes, caption="Business Card QR Code", use_container_width=True)
                 
-                with col3:
-                    st.subheader("QR Codes")
-                    
-                    # Business Card QR Code from Raw Text
-                    if card.detected_text:
-                        try:
-                            qr_image_bytes, _ = Scanner.generate_qr_code({
-                                'raw_text': card.detected_text,
-                                'type': 'business_card'
-                            })
-                            st.image(qr_image_bytes, caption="Business Card QR Code", use_container_width=True)
-                            
-                            # Display raw text below QR code
-                            st.markdown("##### Raw Text Content")
-                            st.code(card.detected_text)
-                        except Exception as e:
-                            st.warning(f"Could not generate business card QR code: {str(e)}")
-                    
-                    # Company QR Code (if company exists)
-                    if card.company:
-                        company = card.company
-                        company_data = {
-                            'name': company.name,
-                            'email': company.email,
-                            'contact_primary': company.contact_primary,
-                            'contact_secondary': company.contact_secondary,
-                            'website': company.website,
-                            'street_address': company.street_address,
-                            'city': company.city,
-                            'state': company.state,
-                            'postal_code': company.postal_code,
-                            'country': company.country,
-                            'industry': company.industry,
-                            'registration_number': company.registration_number,
-                            'social_linkedin': company.social_linkedin,
-                            'social_twitter': company.social_twitter,
-                            'social_facebook': company.social_facebook,
-                            'type': 'company'
-                        }
-                        
-                        # Filter out None values
-                        company_data = {k: v for k, v in company_data.items() if v}
-                        
-                        try:
-                            qr_image_bytes, _ = Scanner.generate_qr_code(company_data)
-                            st.image(qr_image_bytes, caption="Company QR Code", use_container_width=True)
-                            
-                            # Display company info below QR code
-                            st.markdown("##### Company Information")
-                            st.json(company_data)
-                        except Exception as e:
-                            st.warning(f"Could not generate company QR code: {str(e)}")
\ No newline at end of file
+                # Display raw text below QR code
+                st.markdown("##### Raw Text Content")
+                st.code(card.detected_text)
+            except Exception as e:
+                st.warning(f"Could not generate business card QR code: {str(e)}")
+        
+        # Company QR Code (if company exists)
+        if card.company:
+            company = card.company
+            company_data = {
+                'name': company.name,
+                'email': company.email,
+                'contact_primary': company.contact_primary,
+                'contact_secondary': company.contact_secondary,
+                'website': company.website,
+                'street_address': company.street_address,
+                'city': company.city,
+                'state': company.state,
+                'postal_code': company.postal_code,
+                'country': company.country,
+                'industry': company.industry,
+                'registration_number': company.registration_number,
+                'social_linkedin': company.social_linkedin,
+                'social_twitter': company.social_twitter,
+                'social_facebook': company.social_facebook,
+                'type': 'company'
+            }
+            
+            # Filter out None values
+            company_data = {k: v for k, v in company_data.items() if v}
+            
+            try:
+                qr_image_bytes, _ = Scanner.generate_qr_code(company_data, version=company.updated_at)
+                st.image(qr_image_bytes, caption="Company QR Code", use_container_width=True)
+                
+                # Display company info below QR code
+                st.markdown("##### Company Information")
+                st.json(company_data)
+            except Exception as e:
+                st.warning(f"Could not generate company QR code: {str(e)}")
+
+def render_batch_upload_tab():
+    """Render the batch upload tab."""
+    st.header("Batch Upload Business Cards")
+    
+    uploaded_files = st.file_uploader(
+        "Upload Business Card Images",
+        type=['png', 'jpg', 'jpeg'],
+        accept_multiple_files=True,
+        key="batch_upload"
+    )
+    event_name = st.text_input("Event Name (Optional)", key="batch_event_name")
+    split_cards = st.checkbox(
+        "Photos may contain several cards",
+        help="Detect each card in a photo of cards laid out on a table and save them separately"
+    )
+    
+    if uploaded_files and st.button("Process and Save All"):
+        images = [(f.name, f.getvalue()) for f in uploaded_files]
+        if split_cards:
+            with st.spinner("Finding cards in photos..."):
+                images = list(Scanner.split_cards(images))
+        progress = st.progress(0.0, text=f"Processing {len(images)} cards...")
+        saved, failed = 0, []
+        
+        for done, result in enumerate(
+            CardIngestor.ingest(images, st.session_state.user_id, event_name), start=1
+        ):
+            if result['error']:
+                failed.append(result)
+            else:
+                saved += 1
+            progress.progress(done / len(images), text=f"Processed {done} of {len(images)} cards")
+        
+        if saved:
+            st.success(f"Saved {saved} business cards.")
+        for result in failed:
+            st.error(f"{result['name']}: {result['error']}")
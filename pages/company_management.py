@@ -1,11 +1,13 @@
 import streamlit as st
 from database.db import db
-from database.models import Company, BusinessCard
+from database.models import Company
+from database.repository import card_counts_by_company, companies_with_cards
+from database.search import search
 from utils.scanner import Scanner
 from utils.auth import login_required, role_required
+from utils.thumbnails import thumbnail_path
 from datetime import datetime
 import io
-from PIL import Image
 
 @login_required
 @role_required(["Admin"])
@@ -120,9 +122,9 @@ def render_view_companies_tab():
     """Render the view companies tab."""
     st.header("View Companies")
     
-    # Get all companies
+    # Get all companies, with their cards in one more query
     with db.get_session() as session:
-        companies = session.query(Company).all()
+        companies = companies_with_cards(session)
         
         for company in companies:
             with st.expander(f"{company.name} - {company.industry or 'No Industry'}"):
@@ -151,15 +153,13 @@ def render_view_companies_tab():
                 with col2:
                     if company.logo_path:
                         try:
-                            logo = Image.open(company.logo_path)
-                            st.image(logo, caption="Company Logo", use_container_width=True)
+                            st.image(thumbnail_path(company.logo_path), caption="Company Logo",
+                                     use_container_width=True)
                         except Exception:
                             st.warning("Logo file not found")
                     
                     # Show associated business cards
-                    cards = session.query(BusinessCard).filter(
-                        BusinessCard.company_id == company.id
-                    ).all()
+                    cards = company.business_cards
                     if cards:
                         st.write(f"\nAssociated Business Cards ({len(cards)}):")
                         for card in cards:
@@ -194,7 +194,7 @@ def render_view_companies_tab():
                     'address': address.strip(", ")
                 }
                 try:
-                    qr_image_bytes, _ = Scanner.generate_qr_code(company_data)
+                    qr_image_bytes, _ = Scanner.generate_qr_code(company_data, version=company.updated_at)
                     st.image(qr_image_bytes, caption="Company QR Code", use_container_width=True)
                 except Exception as e:
                     st.warning(f"Could not generate company QR code: {str(e)}")
@@ -208,17 +208,16 @@ def render_search_companies_tab():
     
     if search_query:
         with db.get_session() as session:
-            # Build search query
-            search_term = f"%{search_query}%"
-            companies = session.query(Company).filter(
-                (Company.name.like(search_term)) |
-                (Company.industry.like(search_term)) |
-                (Company.city.like(search_term)) |
-                (Company.state.like(search_term)) |
-                (Company.country.like(search_term))
-            ).all()
+            # Full-text matches, best first
+            matches = search(session, Company, search_query)
+            companies = []
+            if matches is not None:
+                companies = session.query(Company).join(
+                    matches, Company.id == matches.c.id
+                ).order_by(matches.c.rank).all()
             
             if companies:
+                card_counts = card_counts_by_company(session, [company.id for company in companies])
                 st.write(f"Found {len(companies)} results:")
                 for company in companies:
                     with st.expander(f"{company.name} - {company.industry or 'No Industry'}"):
@@ -227,10 +226,6 @@ def render_search_companies_tab():
                         st.write(f"Website: {company.website}")
                         st.write(f"Location: {company.city}, {company.state}, {company.country}")
                         
-                        # Count associated cards
-                        card_count = session.query(BusinessCard).filter(
-                            BusinessCard.company_id == company.id
-                        ).count()
-                        st.write(f"Associated Business Cards: {card_count}")
+                        st.write(f"Associated Business Cards: {card_counts[company.id]}")
             else:
                 st.info("No results found") 
\ No newline at end of file
@@ -1,7 +1,9 @@
 import streamlit as st
 from database.db import db
-from database.models import BusinessCard, Company, ExportLog, User
+from database.models import BusinessCard, Company, ExportLog
+from database.repository import cards_for_export, companies_for_export, company_names, export_history
 from utils.export import Exporter
+from utils.scanner import Scanner
 from utils.auth import login_required
 from datetime import datetime, date
 import io
@@ -34,8 +36,7 @@ def render_export_tab():
     # Get data for filtering
     with db.get_session() as session:
         # Get companies for filter
-        companies = session.query(Company).all()
-        company_names = ["All"] + [company.name for company in companies]
+        company_options = ["All"] + company_names(session)
         
         if data_type == "Business Cards":
             # Get date range from business cards
@@ -56,7 +57,7 @@ def render_export_tab():
     
     with col1:
         if data_type == "Business Cards":
-            selected_company = st.selectbox("Company", company_names)
+            selected_company = st.selectbox("Company", company_options)
     
     with col2:
         start_date = st.date_input("Start Date", min_date)
@@ -68,44 +69,22 @@ def render_export_tab():
     export_format = st.selectbox(
         "Export Format",
         ["Excel", "CSV", "PDF", "JSON"] + (["vCard"] if data_type == "Business Cards" else [])
+        + ["QR Codes (ZIP)", "QR Badges (PDF)"]
     )
+    if export_format == "QR Codes (ZIP)":
+        qr_format = st.radio("QR Image Format", ["SVG", "PNG"], horizontal=True)
+        qr_size = st.number_input("QR Size (pixels)", min_value=64, max_value=2048, value=300, step=16)
     
-    # Get filtered data
+    # Get filtered data, cards with their companies in the same query
+    start = datetime.combine(start_date, datetime.min.time())
+    end = datetime.combine(end_date, datetime.max.time())
+    user_id = None if st.session_state.user_role == "Admin" else st.session_state.user_id
     with db.get_session() as session:
         if data_type == "Business Cards":
-            query = session.query(BusinessCard)
-            
-            # Apply company filter
-            if selected_company != "All":
-                company = session.query(Company).filter(Company.name == selected_company).first()
-                if company:
-                    query = query.filter(BusinessCard.company_id == company.id)
-            
-            # Apply date filters
-            query = query.filter(
-                BusinessCard.created_at >= datetime.combine(start_date, datetime.min.time()),
-                BusinessCard.created_at <= datetime.combine(end_date, datetime.max.time())
-            )
-            
-            # Apply user role filter
-            if st.session_state.user_role != "Admin":
-                query = query.filter(BusinessCard.created_by_id == st.session_state.user_id)
-            
-            items = query.all()
+            company_name = None if selected_company == "All" else selected_company
+            items = cards_for_export(session, start, end, company_name=company_name, user_id=user_id)
         else:
-            query = session.query(Company)
-            
-            # Apply date filters
-            query = query.filter(
-                Company.created_at >= datetime.combine(start_date, datetime.min.time()),
-                Company.created_at <= datetime.combine(end_date, datetime.max.time())
-            )
-            
-            # Apply user role filter
-            if st.session_state.user_role != "Admin":
-                query = query.filter(Company.created_by_id == st.session_state.user_id)
-            
-            items = query.all()
+            items = companies_for_export(session, start, end, user_id=user_id)
     
     if not items:
         st.warning("No data found with the selected filters.")
@@ -119,8 +98,7 @@ def render_export_tab():
             with db.get_session() as session:
                 if data_type == "Business Cards":
                     for card in items:
-                        company = session.query(Company).get(card.company_id) if card.company_id else None
-                        card_dict = Exporter.business_card_to_dict(card, company)
+                        card_dict = Exporter.business_card_to_dict(card, card.company)
                         export_data.append(card_dict)
                 else:
                     for company in items:
@@ -153,13 +131,41 @@ def render_export_tab():
                     zip_buffer = io.BytesIO()
                     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
                         for card in items:
-                            company = session.query(Company).get(card.company_id) if card.company_id else None
-                            vcard_data = Exporter.to_vcard(card, company)
+                            vcard_data = Exporter.to_vcard(card, card.company)
                             filename = f"{card.contact_name.lower().replace(' ', '_')}.vcf"
                             zf.writestr(filename, vcard_data)
                     output = zip_buffer.getvalue()
                     mime = "application/zip"
                     filename = "business_cards.zip"
+                elif export_format in ("QR Codes (ZIP)", "QR Badges (PDF)"):
+                    # One batch call renders every QR code, reusing cached ones
+                    if data_type == "Business Cards":
+                        qr_items, labels = [], []
+                        for card in items:
+                            qr_items.append(Exporter.business_card_qr_data(card, card.company))
+                            labels.append(card.contact_name or (card.company.name if card.company else f"card_{card.id}"))
+                    else:
+                        qr_items = [Exporter.company_qr_data(company) for company in items]
+                        labels = [company.name for company in items]
+                    versions = [item.updated_at for item in items]
+                    
+                    if export_format == "QR Codes (ZIP)":
+                        fmt = "svg" if qr_format == "SVG" else "png1"
+                        qr_codes = Scanner.generate_qr_codes(qr_items, versions, fmt=fmt, size=int(qr_size))
+                        output = Exporter.to_qr_zip(
+                            [(label, image) for label, (image, _) in zip(labels, qr_codes)],
+                            extension="svg" if fmt == "svg" else "png"
+                        )
+                        mime = "application/zip"
+                        filename = f"{data_type.lower().replace(' ', '_')}_qr_codes.zip"
+                    else:
+                        qr_codes = Scanner.generate_qr_codes(qr_items, versions, fmt="png1", size=600)
+                        output = Exporter.to_qr_badges_pdf(
+                            [(label, image) for label, (image, _) in zip(labels, qr_codes)],
+                            f"{data_type} QR Badges"
+                        )
+                        mime = "application/pdf"
+                        filename = f"{data_type.lower().replace(' ', '_')}_qr_badges.pdf"
             
             # Log export
             export_log = ExportLog(
@@ -208,16 +214,14 @@ def render_history_tab():
     st.header("Export History")
     
     with db.get_session() as session:
-        # Get export history
+        # Get export history, with the username of each export
         if st.session_state.user_role == "Admin":
-            exports = session.query(ExportLog).order_by(ExportLog.export_date.desc()).all()
+            exports = export_history(session)
         else:
-            exports = session.query(ExportLog).filter(
-                ExportLog.user_id == st.session_state.user_id
-            ).order_by(ExportLog.export_date.desc()).all()
+            exports = export_history(session, user_id=st.session_state.user_id)
         
         if exports:
-            for export in exports:
+            for export, username in exports:
                 with st.expander(f"Export on {export.export_date.strftime('%Y-%m-%d %H:%M:%S')}"):
                     st.write(f"Format: {export.export_type}")
                     st.write(f"Records: {export.items_exported}")
@@ -225,13 +229,6 @@ def render_history_tab():
                     
                     # Get user info for admin view
                     if st.session_state.user_role == "Admin":
-                        try:
-                            user = session.query(User).get(export.user_id)
-                            if user:
-                                st.write(f"Exported by: {user.username}")
-                            else:
-                                st.write("Exported by: Unknown User")
-                        except Exception:
-                            st.write("Exported by: Unknown User")
+                        st.write(f"Exported by: {username or 'Unknown User'}")
         else:
             st.info("No export history found.") 
\ No newline at end of file
@@ -1,6 +1,7 @@
 import streamlit as st
 from database.db import db
 from database.models import User
+from database.repository import users_with_activity
 from utils.auth import AuthManager, PasswordPolicy, login_required, role_required
 from datetime import datetime, timedelta
 
@@ -84,9 +85,10 @@ def render_manage_users_tab():
     st.header("Manage Users")
     
     with db.get_session() as session:
-        users = session.query(User).all()
+        # Each user with their card and company counts, from one query
+        users = users_with_activity(session)
         
-        for user in users:
+        for user, cards_count, companies_count in users:
             with st.expander(f"{user.username} ({user.role})"):
                 col1, col2 = st.columns(2)
                 
@@ -100,14 +102,6 @@ def render_manage_users_tab():
                 
                 with col2:
                     # User statistics
-                    from database.models import BusinessCard, Company
-                    cards_count = session.query(BusinessCard).filter(
-                        BusinessCard.created_by_id == user.id
-                    ).count()
-                    companies_count = session.query(Company).filter(
-                        Company.created_by_id == user.id
-                    ).count()
-                    
                     st.write("Activity Statistics:")
                     st.write(f"Business Cards Created: {cards_count}")
                     st.write(f"Companies Created: {companies_count}")
@@ -0,0 +1,118 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import select, update
+
+from database.db import db
+from database.models import Blob
+from dedupe_images import PATH_COLUMNS, local_path
+from utils.blob_store import blob_store
+from utils.recompress import ARCHIVE_FORMAT, ARCHIVE_MAX_SIDE, OFFLINE_ARCHIVE_METHOD, recompress
+
+# Blobs read and re-encoded between database commits
+CHUNK_SIZE = 50
+
+def _recompress_file(path: str, fmt: str, max_side: int) -> tuple:
+    """Worker: re-encode one stored file; returns (data, extension, original size) or an error string."""
+    try:
+        with open(local_path(path), 'rb') as f:
+            data = f.read()
+        # Nobody is waiting on this pass, so use the smallest encoder setting
+        encoded, extension = recompress(data, fmt=fmt, max_side=max_side, method=OFFLINE_ARCHIVE_METHOD)
+        return encoded, extension, len(data)
+    except Exception as e:
+        return str(e)
+
+def recompress_store(directory: str, fmt: str, max_side: int, workers: int, dry_run: bool):
+    """
+    Re-encode every blob under directory that predates recompression at
+    ingest (original_size is NULL). A blob keeps its digest, so only the
+    extension of its path can change; references are moved with it and the
+    old file is removed once the new one is committed.
+    """
+    store = blob_store(directory)
+    original_total, stored_total, changed, failed = 0, 0, 0, 0
+    last_id = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            with db.get_session() as session:
+                blobs = session.execute(
+                    select(Blob.id, Blob.path, Blob.digest)
+                    .where(Blob.original_size.is_(None), Blob.id > last_id,
+                           Blob.path.startswith(store.root + os.sep))
+                    .order_by(Blob.id).limit(CHUNK_SIZE)
+                ).all()
+            if not blobs:
+                break
+            last_id = blobs[-1].id
+
+            results = executor.map(_recompress_file, [blob.path for blob in blobs],
+                                   [fmt] * len(blobs), [max_side] * len(blobs))
+            replaced = []
+            with db.get_session() as session:
+                for blob, result in zip(blobs, results):
+                    if isinstance(result, str):
+                        print(f"  failed: {blob.path}: {result}")
+                        failed += 1
+                        continue
+                    data, extension, original_size = result
+                    original_total += original_size
+                    stored_total += len(data)
+                    new_path = store.path_for(blob.digest, extension)
+                    if len(data) == original_size and new_path == blob.path:
+                        # Already as small as it gets; just record that it was checked
+                        if not dry_run:
+                            session.execute(update(Blob).where(Blob.id == blob.id)
+                                            .values(original_size=original_size))
+                        continue
+                    changed += 1
+                    if dry_run:
+                        continue
+                    target = new_path if new_path != blob.path else f"{blob.path}.new"
+                    store.write(local_path(target), data)
+                    session.execute(update(Blob).where(Blob.id == blob.id).values(
+                        path=new_path, size=len(data), original_size=original_size
+                    ))
+                    if new_path != blob.path:
+                        # Core updates; the blob row moved with its references, so counts stand
+                        for column in PATH_COLUMNS:
+                            session.execute(update(column.class_).where(column == blob.path)
+                                            .values({column.key: new_path}))
+                    replaced.append((blob.path, target, new_path))
+            # Only touch files once the new paths are committed
+            for old_path, target, new_path in replaced:
+                if target != new_path:
+                    os.replace(local_path(target), local_path(new_path))
+                elif os.path.exists(local_path(old_path)):
+                    os.remove(local_path(old_path))
+            print(f"{last_id}: {changed} recompressed, {failed} failed, "
+                  f"{original_total / 1048576:.1f} MB -> {stored_total / 1048576:.1f} MB")
+
+    if original_total:
+        print(f"{'Would save' if dry_run else 'Saved'} {(original_total - stored_total) / 1048576:.1f} MB "
+              f"({original_total / max(stored_total, 1):.1f}x smaller)")
+    else:
+        print("Nothing to recompress")
+
+def main():
+    """Recompress stored images into the archival format."""
+    parser = argparse.ArgumentParser(description="Recompress stored card images into the archival format.")
+    parser.add_argument("--directory", default="uploads", help="Blob store to recompress (default: uploads)")
+    parser.add_argument("--format", default=ARCHIVE_FORMAT, choices=("webp", "jpeg", "original"),
+                        help="Archival format (default: CARDSNAP_ARCHIVE_FORMAT or webp)")
+    parser.add_argument("--max-side", type=int, default=ARCHIVE_MAX_SIDE,
+                        help="Cap on the longest side in pixels, 0 for none")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Encoding processes")
+    parser.add_argument("--dry-run", action="store_true", help="Report the savings without changing anything")
+    args = parser.parse_args()
+
+    try:
+        recompress_store(args.directory, args.format, args.max_side, args.workers, args.dry_run)
+    except Exception as e:
+        print(f"Error during recompression: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import select, update
+
+from database.db import db
+from database.models import BusinessCard
+from utils.ingest import derived_columns
+from utils.scanner import Scanner
+
+DEFAULT_CHECKPOINT = "reparse_checkpoint.json"
+
+def parse_rows(rows: list) -> list:
+    """
+    Re-parse (id, detected_text, ocr_lines, qr_code_data) rows into bulk
+    UPDATE parameter dicts. Cards with region OCR lines are parsed from them,
+    as at ingest; cards filled from a contact QR code are left alone, since
+    their fields did not come from the text.
+    """
+    updates = []
+    for card_id, detected_text, ocr_lines, qr_code_data in rows:
+        if qr_code_data and Scanner.parse_contact_qr(qr_code_data) is not None:
+            continue
+        if ocr_lines:
+            _, parsed_info = Scanner._parse_ocr_lines(ocr_lines)
+        else:
+            parsed_info = Scanner._parse_business_card_text(detected_text)
+        updates.append({'id': card_id, 'parsed_data': parsed_info, **derived_columns(parsed_info)})
+    return updates
+
+def load_checkpoint(path: str) -> dict:
+    """Return the saved progress, or a fresh one if there is none."""
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {'last_id': 0, 'rows': 0}
+
+def save_checkpoint(path: str, checkpoint: dict):
+    """Write the checkpoint atomically so an interrupted run can resume."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+def iter_chunks(after_id: int, chunk_size: int):
+    """
+    Stream cards with detected text in primary-key order, one short read
+    transaction per chunk so updates can commit in between. Cards without
+    text, such as those filled from a QR code, are skipped.
+    """
+    while True:
+        with db.get_session() as session:
+            result = session.execute(
+                select(BusinessCard.id, BusinessCard.detected_text, BusinessCard.ocr_lines,
+                       BusinessCard.qr_code_data)
+                .where(BusinessCard.id > after_id, BusinessCard.detected_text.isnot(None),
+                       BusinessCard.detected_text != '')
+                .order_by(BusinessCard.id)
+                .limit(chunk_size)
+                .execution_options(yield_per=chunk_size)
+            )
+            chunk = [tuple(row) for row in result]
+        if not chunk:
+            return
+        yield chunk
+        after_id = chunk[-1][0]
+
+def reparse(chunk_size: int, workers: int, checkpoint_path: str, resume: bool):
+    """Re-parse every stored card and write parsed_data and derived columns back."""
+    checkpoint = load_checkpoint(checkpoint_path) if resume else {'last_id': 0, 'rows': 0}
+    if checkpoint['last_id']:
+        print(f"Resuming after card id {checkpoint['last_id']} ({checkpoint['rows']} rows done)")
+
+    started = time.perf_counter()
+    rows_this_run = 0
+    # Workers get a few sub-batches each per chunk
+    sub_batch = max(1, chunk_size // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in iter_chunks(checkpoint['last_id'], chunk_size):
+            batches = [chunk[i:i + sub_batch] for i in range(0, len(chunk), sub_batch)]
+            updates = [u for batch in executor.map(parse_rows, batches) for u in batch]
+
+            if updates:
+                with db.get_session() as session:
+                    session.execute(update(BusinessCard), updates)
+
+            checkpoint['last_id'] = chunk[-1][0]
+            checkpoint['rows'] += len(chunk)
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            rows_this_run += len(chunk)
+            elapsed = time.perf_counter() - started
+            print(f"Re-parsed {checkpoint['rows']} rows (up to id {checkpoint['last_id']}), "
+                  f"{rows_this_run / elapsed:.0f} rows/s")
+
+    elapsed = time.perf_counter() - started
+    print(f"Done: {rows_this_run} rows in {elapsed:.1f}s"
+          + (f" ({rows_this_run / elapsed:.0f} rows/s)" if elapsed else ""))
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+def main():
+    """Re-run the business card parser over stored detected_text."""
+    parser = argparse.ArgumentParser(description="Re-parse stored business card text.")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows read and updated per transaction")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser processes")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Progress file used to resume")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    try:
+        reparse(args.chunk_size, args.workers, args.checkpoint, resume=not args.restart)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; run again to resume from {args.checkpoint}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error during re-parse: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
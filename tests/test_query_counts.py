@@ -0,0 +1,80 @@
+"""
+The list pages run a fixed number of queries however many rows they show.
+Each page's data is loaded through database.repository on a small and a
+large scratch database, touching every attribute the page renders, and the
+SQL statements are counted; a count that grows with the rows is an N+1
+query.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from benchmarks.seed import company_name, seed
+from database import repository
+from database.db import make_engine
+
+START, END = datetime(2000, 1, 1), datetime(2100, 1, 1)
+# Companies in the small and the large database, five cards each. selectinload
+# batches 500 parents per IN query, so both sizes stay within one batch.
+SIZES = (10, 400)
+
+# What each page loads and renders, with the statements it should take
+PAGES = {
+    'export: cards with companies': (1, lambda session: [
+        (card.contact_name, card.company.name if card.company else None)
+        for card in repository.cards_for_export(session, START, END)
+    ]),
+    'export: cards of one company': (1, lambda session: [
+        card.company.name
+        for card in repository.cards_for_export(session, START, END, company_name=company_name(1))
+    ]),
+    'export: companies': (1, lambda session: [
+        company.name for company in repository.companies_for_export(session, START, END, user_id=1)
+    ]),
+    'export history': (1, lambda session: [
+        (log.export_type, username) for log, username in repository.export_history(session)
+    ]),
+    'view companies': (2, lambda session: [
+        [(card.contact_name, card.position) for card in company.business_cards]
+        for company in repository.companies_with_cards(session)
+    ]),
+    'search companies: card counts': (1, lambda session: repository.card_counts_by_company(
+        session, range(1, SIZES[1] + 1))),
+    'manage users': (1, lambda session: [
+        (user.username, cards, companies) for user, cards, companies in repository.users_with_activity(session)
+    ]),
+    'company filter': (1, repository.company_names),
+}
+
+def count_queries(engine, load) -> int:
+    """Statements executed while load renders a page in a fresh session."""
+    statements = []
+    def record(connection, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        with Session(engine) as session:
+            load(session)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    return len(statements)
+
+@pytest.fixture(scope='module')
+def engines(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('queries')
+    engines = []
+    for companies in SIZES:
+        engine = make_engine(f"sqlite:///{directory / f'queries{companies}.db'}", echo=False)
+        seed(engine, companies * 5, companies=companies, users=max(2, companies // 10))
+        engines.append(engine)
+    yield engines
+    for engine in engines:
+        engine.dispose()
+
+@pytest.mark.parametrize('name', PAGES)
+def test_page_query_count(engines, name):
+    expected, load = PAGES[name]
+    counts = [count_queries(engine, load) for engine in engines]
+    assert counts == [expected] * len(engines), f"{name}: {counts} queries at {SIZES} companies"
@@ -0,0 +1,91 @@
+"""
+The hot queries of the pages are answered from an index. Each query is
+built the way its page builds it and run through EXPLAIN QUERY PLAN on a
+seeded scratch database; it fails if SQLite scans a whole table without an
+index or sorts rows it did not narrow down with an index first.
+"""
+import re
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload
+
+from benchmarks.seed import company_name, seed
+from database.db import make_engine
+from database.models import BusinessCard, Company, ExportLog
+
+CARDS = 20000
+
+# A plan step that reads every row of a table without an index
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+def hot_queries(session: Session) -> dict:
+    """The page queries worth an index, keyed by where they run."""
+    start, end = datetime(2024, 6, 1), datetime(2024, 12, 31, 23, 59, 59)
+    user_id, company_id = 3, 7
+    cards = session.query(BusinessCard)
+    companies = session.query(Company)
+    return {
+        'dashboard: card count of a user': select(func.count()).select_from(
+            cards.filter(BusinessCard.created_by_id == user_id).subquery()),
+        'dashboard: company count of a user': select(func.count()).select_from(
+            companies.filter(Company.created_by_id == user_id).subquery()),
+        'dashboard: recent cards': cards.order_by(BusinessCard.created_at.desc()).limit(5),
+        'view cards: newest first': session.query(BusinessCard).options(joinedload(BusinessCard.company))
+            .order_by(BusinessCard.created_at.desc()),
+        'view cards: cards of a company': session.query(BusinessCard).options(joinedload(BusinessCard.company))
+            .join(Company).filter(Company.name == company_name(company_id)).order_by(BusinessCard.created_at.desc()),
+        'save card: company by name': companies.filter(Company.name == company_name(company_id)).limit(1),
+        'company view: cards of a company': cards.filter(BusinessCard.company_id == company_id),
+        'export: first card': cards.order_by(BusinessCard.created_at.asc()).limit(1),
+        'export: cards in a date range': cards.filter(
+            BusinessCard.created_at >= start, BusinessCard.created_at <= end),
+        'export: cards of a company in a date range': cards.filter(
+            BusinessCard.company_id == company_id,
+            BusinessCard.created_at >= start, BusinessCard.created_at <= end),
+        'export: cards of a user in a date range': cards.filter(
+            BusinessCard.created_at >= start, BusinessCard.created_at <= end,
+            BusinessCard.created_by_id == user_id),
+        'export: companies of a user in a date range': companies.filter(
+            Company.created_at >= start, Company.created_at <= end, Company.created_by_id == user_id),
+        'export history: all': session.query(ExportLog).order_by(ExportLog.export_date.desc()),
+        'export history: a user': session.query(ExportLog).filter(ExportLog.user_id == user_id)
+            .order_by(ExportLog.export_date.desc()),
+    }
+
+# Query names, so each query is reported as its own test
+HOT_QUERIES = list(hot_queries(Session()))
+
+def query_plan(session: Session, query) -> list:
+    """EXPLAIN QUERY PLAN of a Query or select(), as a list of step descriptions."""
+    statement = query.statement if hasattr(query, 'statement') else query
+    compiled = statement.compile(dialect=session.bind.dialect)
+    params = [compiled.params[name] for name in compiled.positiontup]
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {compiled}", params)
+        return [row[3] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+def problems(plan: list) -> list:
+    """Plan steps that mean the query does not use an index the way it should."""
+    bad = [step for step in plan if FULL_SCAN.match(step)]
+    # Sorting the few rows an index search found is fine; sorting a whole table is not
+    if not any(step.startswith('SEARCH') for step in plan):
+        bad += [step for step in plan if 'TEMP B-TREE' in step]
+    return bad
+
+@pytest.fixture(scope='module')
+def session(tmp_path_factory):
+    engine = make_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}", echo=False)
+    seed(engine, CARDS)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_query_uses_an_index(session, name):
+    plan = query_plan(session, hot_queries(session)[name])
+    assert problems(plan) == [], f"{name}:\n" + '\n'.join(plan)
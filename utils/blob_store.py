@@ -0,0 +1,153 @@
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from typing import Optional
+
+from PIL import Image
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+
+from database.db import db
+from database.models import Blob, BusinessCard, Company
+from utils.recompress import recompress
+
+logger = logging.getLogger(__name__)
+
+class BlobStore:
+    """
+    Content-addressed file store: a blob lives at
+    <root>/<aa>/<bb>/<sha256>.<ext>, so identical uploads share one file.
+    Uploads are addressed by the hash of the bytes as received, even when
+    they are stored recompressed, so a re-upload is still recognised.
+    Each stored file has a row in the blobs table whose ref_count tracks the
+    cards and companies pointing at it.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        """SHA-256 of data, the blob's identity."""
+        return hashlib.sha256(data).hexdigest()
+
+    def path_for(self, digest: str, extension: str) -> str:
+        """Sharded location of a blob; two levels keep directories small."""
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.{extension}")
+
+    def put(self, data: bytes, extension: str = "png", digest: Optional[str] = None,
+            original_size: Optional[int] = None) -> str:
+        """
+        Store data unless an identical blob exists and return its path.
+        digest defaults to the hash of data. original_size is the upload's
+        size before recompression; leave it None for files stored as found.
+        """
+        digest = digest or self.digest(data)
+        path = self.path_for(digest, extension)
+        if not os.path.exists(path):
+            self.write(path, data)
+        self._register(path, digest, len(data), original_size)
+        return path
+
+    @staticmethod
+    def write(path: str, data: bytes):
+        """Write data to a temporary file and rename it into place, so readers never see a partial blob."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def put_upload(self, image_bytes: bytes, image: Optional[Image.Image] = None,
+                   digest: Optional[str] = None) -> str:
+        """
+        Store an uploaded image in the archival format (see utils.recompress)
+        and return its path. A re-upload of the same bytes reuses the stored
+        blob without decoding or encoding anything.
+        """
+        digest = digest or self.digest(image_bytes)
+        existing = self.find(digest)
+        if existing is not None and os.path.exists(existing.path):
+            return existing.path
+        data, extension = recompress(image_bytes, image)
+        return self.put(data, extension, digest, original_size=len(image_bytes))
+
+    @staticmethod
+    def _register(path: str, digest: str, size: int, original_size: Optional[int]):
+        """Add the blobs row for path if it is new."""
+        try:
+            with db.get_session() as session:
+                if session.execute(select(Blob.id).where(Blob.path == path)).first() is None:
+                    session.add(Blob(path=path, digest=digest, size=size,
+                                     original_size=original_size, ref_count=0))
+        except IntegrityError:
+            # Registered concurrently by another writer
+            pass
+
+    def find(self, digest: str) -> Optional[Blob]:
+        """Return the stored blob with this content hash, if any; an indexed lookup."""
+        with db.get_session() as session:
+            return session.execute(
+                select(Blob).where(Blob.digest == digest, Blob.path.startswith(self.root + os.sep))
+            ).scalars().first()
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def blob_store(directory: str) -> BlobStore:
+    """Return the blob store rooted at directory, e.g. "uploads" or "company_logos"."""
+    with _stores_lock:
+        if directory not in _stores:
+            _stores[directory] = BlobStore(directory)
+        return _stores[directory]
+
+def recount_references():
+    """Recompute every ref_count from business_cards.image_path and companies.logo_path."""
+    with db.get_session() as session:
+        counts = {}
+        for column in (BusinessCard.image_path, Company.logo_path):
+            for path, count in session.execute(
+                select(column, func.count()).where(column.isnot(None)).group_by(column)
+            ):
+                counts[path] = counts.get(path, 0) + count
+        session.execute(update(Blob).values(ref_count=0))
+        if counts:
+            blob_ids = dict(session.execute(select(Blob.path, Blob.id).where(Blob.path.in_(list(counts)))).all())
+            session.execute(update(Blob), [
+                {'id': blob_id, 'ref_count': counts[path]} for path, blob_id in blob_ids.items()
+            ])
+
+def _adjust(connection, path: Optional[str], delta: int):
+    """Change the ref_count of the blob at path; paths outside the store are ignored."""
+    if path:
+        connection.execute(update(Blob).where(Blob.path == path).values(ref_count=Blob.ref_count + delta))
+
+def _track(column: str):
+    """Keep blob ref_counts in step with an image path column, in the same transaction."""
+    def after_insert(mapper, connection, target):
+        _adjust(connection, getattr(target, column), 1)
+
+    def after_update(mapper, connection, target):
+        history = getattr(inspect(target).attrs, column).history
+        for path in history.deleted:
+            _adjust(connection, path, -1)
+        for path in history.added:
+            _adjust(connection, path, 1)
+
+    def after_delete(mapper, connection, target):
+        _adjust(connection, getattr(target, column), -1)
+    return after_insert, after_update, after_delete
+
+for model, column in ((BusinessCard, 'image_path'), (Company, 'logo_path')):
+    after_insert, after_update, after_delete = _track(column)
+    event.listen(model, 'after_insert', after_insert)
+    event.listen(model, 'after_update', after_update)
+    event.listen(model, 'after_delete', after_delete)
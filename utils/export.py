@@ -5,7 +5,11 @@ from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
 from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
 import io
+import re
+import zipfile
 from typing import List, Dict, Any
 from database.models import BusinessCard, Company
 
@@ -88,6 +92,88 @@ class Exporter:
         except Exception as e:
             raise Exception(f"Error exporting to PDF: {str(e)}")
     
+    @staticmethod
+    def to_qr_zip(entries: List[tuple], extension: str = "png") -> bytes:
+        """Export (name, qr_code_bytes) pairs as a ZIP with one image per entry."""
+        try:
+            zip_buffer = io.BytesIO()
+            used_names = set()
+            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+                for name, image_bytes in entries:
+                    stem = re.sub(r'[^a-z0-9]+', '_', (name or 'qr_code').lower()).strip('_') or 'qr_code'
+                    filename = f"{stem}.{extension}"
+                    counter = 2
+                    while filename in used_names:
+                        filename = f"{stem}_{counter}.{extension}"
+                        counter += 1
+                    used_names.add(filename)
+                    zf.writestr(filename, image_bytes)
+            return zip_buffer.getvalue()
+            
+        except Exception as e:
+            raise Exception(f"Error exporting QR codes to ZIP: {str(e)}")
+    
+    @staticmethod
+    def to_qr_badges_pdf(entries: List[tuple], title: str = "QR Badges",
+                         columns: int = 3, rows: int = 4) -> bytes:
+        """Export (label, qr_png_bytes) pairs as a PDF sheet of labelled QR badges."""
+        try:
+            buffer = io.BytesIO()
+            pdf = canvas.Canvas(buffer, pagesize=letter)
+            pdf.setTitle(title)
+            page_width, page_height = letter
+            margin = 36
+            cell_width = (page_width - 2 * margin) / columns
+            cell_height = (page_height - 2 * margin) / rows
+            qr_size = min(cell_width, cell_height) - 36
+            
+            for index, (label, image_bytes) in enumerate(entries):
+                slot = index % (columns * rows)
+                if index and slot == 0:
+                    pdf.showPage()
+                column, row = slot % columns, slot // columns
+                x = margin + column * cell_width
+                y = page_height - margin - (row + 1) * cell_height
+                pdf.drawImage(
+                    ImageReader(io.BytesIO(image_bytes)),
+                    x + (cell_width - qr_size) / 2, y + 24,
+                    width=qr_size, height=qr_size
+                )
+                pdf.setFont('Helvetica', 9)
+                pdf.drawCentredString(x + cell_width / 2, y + 10, (label or '')[:40])
+            
+            pdf.save()
+            return buffer.getvalue()
+            
+        except Exception as e:
+            raise Exception(f"Error exporting QR badges to PDF: {str(e)}")
+    
+    @staticmethod
+    def business_card_qr_data(card: BusinessCard, company: Company = None) -> Dict[str, Any]:
+        """Data passed to Scanner.generate_qr_code(s) for a business card."""
+        if card.detected_text:
+            return {'raw_text': card.detected_text, 'type': 'business_card'}
+        return {
+            'name': card.contact_name,
+            'company': company.name if company else None,
+            'position': card.position,
+            'phone': card.phone,
+            'email': card.email,
+            'website': card.website
+        }
+    
+    @staticmethod
+    def company_qr_data(company: Company) -> Dict[str, Any]:
+        """Data passed to Scanner.generate_qr_code(s) for a company."""
+        address = f"{company.street_address}, {company.city}, {company.state} {company.postal_code}, {company.country}"
+        return {
+            'name': company.name,
+            'email': company.email,
+            'phone': company.contact_primary,
+            'website': company.website,
+            'address': address.strip(", ")
+        }
+    
     @staticmethod
     def to_vcard(card: BusinessCard, company: Company = None) -> bytes:
         """Export business card to vCard format."""
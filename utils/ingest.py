@@ -0,0 +1,117 @@
+import logging
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from database.db import db
+from database.models import BusinessCard, Company
+from utils.scanner import Scanner
+
+logger = logging.getLogger(__name__)
+
+# Parsed fields copied onto BusinessCard columns of a different name
+PARSED_FIELD_COLUMNS = {
+    'name': 'contact_name',
+    'position': 'position',
+    'email': 'email',
+    'phone': 'phone',
+    'mobile': 'mobile',
+    'fax': 'fax',
+    'website': 'website',
+    'address': 'street_address',
+    'city': 'city',
+    'state': 'state',
+    'postal_code': 'postal_code',
+    'country': 'country',
+    'department': 'department',
+    'linkedin': 'social_linkedin',
+    'twitter': 'social_twitter',
+    'facebook': 'social_facebook',
+    'notes': 'notes',
+}
+
+# Parsed fields saved on the card as-is; the rest are reviewed in the Add Card form
+DERIVED_FIELDS = (
+    'mobile', 'fax', 'address', 'city', 'state', 'postal_code', 'country',
+    'department', 'linkedin', 'twitter', 'facebook', 'notes'
+)
+
+def derived_columns(parsed_info: dict) -> dict:
+    """Map the DERIVED_FIELDS of parsed_info to BusinessCard column values."""
+    return {PARSED_FIELD_COLUMNS[field]: parsed_info.get(field) for field in DERIVED_FIELDS}
+
+class CardIngestor:
+    @staticmethod
+    def build_card(result: dict, user_id: int, event_name: Optional[str] = None,
+                   company_id: Optional[int] = None) -> BusinessCard:
+        """Create an unsaved BusinessCard from a Scanner.scan_batch result."""
+        parsed_info = result.get('parsed_info') or {}
+        card = BusinessCard(
+            company_id=company_id,
+            event_name=event_name or None,
+            created_by_id=user_id,
+            created_at=datetime.utcnow(),
+            detected_text=result.get('raw_text'),
+            parsed_data=parsed_info or None,
+            ocr_lines=result.get('ocr_lines'),
+            qr_code_data=result.get('qr_code_data'),
+            image_path=result.get('image_path')
+        )
+        for field, column in PARSED_FIELD_COLUMNS.items():
+            setattr(card, column, parsed_info.get(field) or None)
+        return card
+
+    @staticmethod
+    def persist(results: Iterable[dict], user_id: int, event_name: Optional[str] = None,
+                batch_size: int = 50) -> Iterator[dict]:
+        """
+        Save successful scan results as business cards, committing one
+        transaction per batch_size cards. Every result is yielded back once
+        it has been handled so callers can report progress.
+        """
+        pending = []
+        for result in results:
+            if result.get('error'):
+                yield result
+                continue
+            pending.append(result)
+            if len(pending) >= batch_size:
+                yield from CardIngestor._flush(pending, user_id, event_name)
+                pending = []
+        if pending:
+            yield from CardIngestor._flush(pending, user_id, event_name)
+
+    @staticmethod
+    def _flush(results: list, user_id: int, event_name: Optional[str]) -> list:
+        """Write one batch of scan results in a single transaction."""
+        # Companies need an email, so cards are only linked to existing ones
+        names = {r['parsed_info'].get('company') for r in results if r.get('parsed_info')}
+        names.discard(None)
+        try:
+            with db.get_session() as session:
+                company_ids = {}
+                if names:
+                    company_ids = dict(
+                        session.query(Company.name, Company.id).filter(Company.name.in_(names)).all()
+                    )
+                for result in results:
+                    company_name = (result.get('parsed_info') or {}).get('company')
+                    session.add(CardIngestor.build_card(
+                        result, user_id, event_name, company_ids.get(company_name)
+                    ))
+        except Exception as e:
+            logger.error(f"Error saving batch of {len(results)} cards: {e}")
+            for result in results:
+                result['error'] = f"Error saving card: {str(e)}"
+        return results
+
+    @staticmethod
+    def ingest(images: Iterable[tuple[str, bytes]], user_id: int, event_name: Optional[str] = None,
+               max_workers: int = None, batch_size: int = 50, split_cards: bool = False) -> Iterator[dict]:
+        """
+        Scan images in parallel and save them as business cards in batches.
+        With split_cards, photos of several cards produce one card per card found.
+        """
+        if split_cards:
+            images = Scanner.split_cards(images)
+        results = Scanner.scan_batch(images, max_workers=max_workers)
+        yield from CardIngestor.persist(results, user_id, event_name, batch_size)
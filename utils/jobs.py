@@ -0,0 +1,216 @@
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, update
+
+from database.db import db
+from database.models import CardJob
+from utils.blob_store import BlobStore
+from utils.recompress import sniff_extension
+from utils.scanner import ScanJob
+
+logger = logging.getLogger(__name__)
+
+# Worker threads per process; OCR runs outside the GIL in tesseract
+CARD_JOB_WORKERS = int(os.environ.get('CARDSNAP_JOB_WORKERS', str(min(4, os.cpu_count() or 1))))
+# Seconds an idle worker waits before checking the table for jobs queued elsewhere
+CARD_JOB_POLL_SECONDS = 5.0
+# Uploads wait here as received until a worker stores them in the blob store
+INCOMING_DIRECTORY = os.path.join('uploads', 'incoming')
+
+def run_card_job(job: ScanJob, options: dict) -> dict:
+    """
+    The work "Process Card" used to do inline: a contact QR code fills the
+    fields without OCR, otherwise the card is OCR'd and parsed. Any QR payload
+    found is kept for the card's qr_code_data.
+    """
+    result = {'raw_text': "", 'parsed_info': None, 'qr_code_data': None, 'ocr_lines': None, 'warnings': []}
+    try:
+        result['qr_code_data'], result['parsed_info'] = job.scan_contact_qr()
+        if result['qr_code_data'] is None:
+            result['qr_code_data'] = job.scan_qr_code()
+    except Exception as e:
+        result['warnings'].append(f"Could not scan QR code: {str(e)}")
+
+    if result['parsed_info'] is None or options.get('force_ocr'):
+        if options.get('line_ocr'):
+            raw_text, parsed_info, result['ocr_lines'] = job.extract_lines()
+        else:
+            raw_text, parsed_info = job.extract_text()
+        result['raw_text'] = raw_text
+        # Fields from a contact QR code win over OCR
+        result['parsed_info'] = result['parsed_info'] or parsed_info
+    return result
+
+class CardJobQueue:
+    """
+    Card processing jobs persisted in the card_jobs table and run by worker
+    threads, so the Streamlit script only submits and polls. Jobs outlive
+    reruns, and jobs interrupted by a restart are queued again on start.
+    """
+
+    def __init__(self, workers: int = CARD_JOB_WORKERS):
+        self.workers = workers
+        self._wakeup = threading.Condition()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads once per process."""
+        with self._lock:
+            if self._threads:
+                return
+            # Nothing is running yet in this process, so 'running' rows were interrupted
+            with db.get_session() as session:
+                session.execute(
+                    update(CardJob).where(CardJob.status == 'running')
+                    .values(status='queued', started_at=None)
+                )
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"card-job-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, image_bytes: bytes, user_id: int, options: Optional[dict] = None) -> int:
+        """
+        Queue a job for an upload and return the job id. The bytes are only
+        written out as received; the worker recompresses and stores them.
+        """
+        # Reading the header is cheap and rejects files that are not images
+        image_path = os.path.join(INCOMING_DIRECTORY, f"{uuid.uuid4().hex}.{sniff_extension(image_bytes)}")
+        BlobStore.write(image_path, image_bytes)
+        return self._enqueue(CardJob(
+            status='queued',
+            image_digest=BlobStore.digest(image_bytes),
+            image_path=image_path,
+            options=options or {},
+            created_by_id=user_id,
+            created_at=datetime.utcnow()
+        ))
+
+    def resubmit(self, job: CardJob, options: dict) -> int:
+        """
+        Queue the image of an earlier job again with extra options and return
+        the new job id. The earlier job is superseded and no longer offered for saving.
+        """
+        with db.get_session() as session:
+            session.execute(update(CardJob).where(CardJob.id == job.id).values(status='superseded'))
+        return self._enqueue(CardJob(
+            status='queued',
+            image_digest=job.image_digest,
+            image_path=job.image_path,
+            options={**(job.options or {}), **options},
+            created_by_id=job.created_by_id,
+            created_at=datetime.utcnow()
+        ))
+
+    def _enqueue(self, job: CardJob) -> int:
+        """Insert a queued job and wake a worker."""
+        self.start()
+        with db.get_session() as session:
+            session.add(job)
+            session.flush()
+            job_id = job.id
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    @staticmethod
+    def get(job_id: int) -> Optional[CardJob]:
+        """Return the job row, detached from its session."""
+        with db.get_session() as session:
+            return session.get(CardJob, job_id)
+
+    @staticmethod
+    def unsaved(user_id: int, limit: int = 20) -> list:
+        """Return the user's finished jobs that have not been saved as cards, newest first."""
+        with db.get_session() as session:
+            return (
+                session.query(CardJob)
+                .filter(CardJob.created_by_id == user_id, CardJob.status == 'done', CardJob.card_id.is_(None))
+                .order_by(CardJob.id.desc())
+                .limit(limit)
+                .all()
+            )
+
+    @staticmethod
+    def mark_saved(session, job_id: int, card_id: int):
+        """Link a job to the card saved from it, inside the caller's transaction."""
+        session.execute(update(CardJob).where(CardJob.id == job_id).values(card_id=card_id))
+
+    @staticmethod
+    def forget_card(session, card_id: int):
+        """
+        Delete the jobs a card was saved from, inside the caller's transaction
+        deleting the card. Unlinking them instead would offer the scan for
+        saving again and keep its image from being collected.
+        """
+        session.execute(delete(CardJob).where(CardJob.card_id == card_id))
+
+    @staticmethod
+    def _claim() -> Optional[CardJob]:
+        """Atomically take the oldest queued job, or return None."""
+        with db.get_session() as session:
+            job_ids = session.query(CardJob.id).filter(CardJob.status == 'queued').order_by(CardJob.id).limit(5)
+            for (job_id,) in job_ids.all():
+                # Only one worker's conditional update can flip the status
+                claimed = session.execute(
+                    update(CardJob).where(CardJob.id == job_id, CardJob.status == 'queued')
+                    .values(status='running', started_at=datetime.utcnow())
+                ).rowcount
+                if claimed:
+                    session.commit()
+                    return session.get(CardJob, job_id)
+        return None
+
+    def _work(self):
+        """Worker thread loop."""
+        while True:
+            try:
+                job = self._claim()
+            except Exception as e:
+                logger.error(f"Could not claim card job: {e}")
+                job = None
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(timeout=CARD_JOB_POLL_SECONDS)
+                continue
+            self._run(job)
+
+    @staticmethod
+    def _run(job: CardJob):
+        """
+        Execute one job and record its result or error. A new upload is OCR'd
+        from the bytes as received, then stored in the blob store with its
+        thumbnails, and the job is pointed at the stored copy.
+        """
+        incoming = os.path.dirname(job.image_path) == INCOMING_DIRECTORY
+        try:
+            with open(job.image_path, 'rb') as f:
+                scan = ScanJob(f.read())
+            values = {'status': 'done', 'result': run_card_job(scan, job.options or {})}
+            if incoming:
+                values['image_path'] = scan.save_image()
+        except Exception as e:
+            logger.error(f"Card job {job.id} failed: {e}")
+            values = {'status': 'failed', 'error': str(e)}
+        values['finished_at'] = datetime.utcnow()
+        try:
+            with db.get_session() as session:
+                session.execute(update(CardJob).where(CardJob.id == job.id).values(**values))
+        except Exception as e:
+            logger.error(f"Could not record result of card job {job.id}: {e}")
+            return
+        if 'image_path' in values:
+            # Only once no job refers to it; a crash before this stores it again on restart
+            try:
+                os.remove(job.image_path)
+            except OSError as e:
+                logger.warning(f"Could not remove incoming upload {job.image_path}: {e}")
+
+# Create a global instance of CardJobQueue
+card_jobs = CardJobQueue()
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Cache settings, overridable from the environment
+OCR_CACHE_PATH = os.environ.get('CARDSNAP_OCR_CACHE_PATH', 'ocr_cache.db')
+OCR_CACHE_MEMORY_ITEMS = int(os.environ.get('CARDSNAP_OCR_CACHE_MEMORY_ITEMS', '256'))
+OCR_CACHE_MAX_BYTES = int(os.environ.get('CARDSNAP_OCR_CACHE_MAX_MB', '64')) * 1024 * 1024
+
+class OCRCache:
+    """Two-tier (in-memory LRU + on-disk SQLite) cache of OCR results."""
+
+    def __init__(self, path: str = OCR_CACHE_PATH, memory_items: int = OCR_CACHE_MEMORY_ITEMS,
+                 max_bytes: int = OCR_CACHE_MAX_BYTES):
+        self.path = path
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if hasattr(os, 'register_at_fork'):
+            # SQLite connections must not be shared with forked pool workers
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self):
+        """Give a forked child its own lock and connection."""
+        self._lock = threading.Lock()
+        self._conn = None
+
+    @staticmethod
+    def make_key(image_digest: str, config: dict) -> str:
+        """Build a cache key from the SHA-256 of the image bytes and the OCR configuration."""
+        digest = hashlib.sha256(image_digest.encode('ascii'))
+        digest.update(json.dumps(config, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the disk tier on first use. Caller must hold the lock."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_ocr_cache_last_access ON ocr_cache (last_access)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key: str, value: str):
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            try:
+                conn = self._connect()
+                row = conn.execute("SELECT value FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE ocr_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"OCR cache read failed: {e}")
+                return None
+            self._remember(key, row[0])
+            return row[0]
+
+    def set(self, key: str, value: str):
+        """Store value in both tiers, trimming the disk tier to max_bytes."""
+        with self._lock:
+            self._remember(key, value)
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO ocr_cache (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                    (key, value, len(value.encode('utf-8')), time.time())
+                )
+                self._evict(conn)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"OCR cache write failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Delete least recently used disk entries until under max_bytes."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM ocr_cache ORDER BY last_access"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM ocr_cache WHERE key = ?", victims)
+
+    def clear(self):
+        """Drop every cached entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            conn = self._connect()
+            conn.execute("DELETE FROM ocr_cache")
+            conn.commit()
+
+# Create a global instance of OCRCache
+ocr_cache = OCRCache()
@@ -0,0 +1,156 @@
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+
+import pytesseract
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:  # Optional: pip install tesserocr
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+# Backend used by Scanner: "auto", "tesserocr" or "pytesseract"
+OCR_ENGINE = os.environ.get('CARDSNAP_OCR_ENGINE', 'auto')
+
+class OCREngine(ABC):
+    """Interface of an OCR backend."""
+    name = None
+
+    @abstractmethod
+    def image_to_string(self, image: Image.Image, lang: str = 'eng') -> str:
+        """Return the text recognised in image."""
+
+    @abstractmethod
+    def image_to_lines(self, image: Image.Image, lang: str = 'eng', psm: int = 6) -> list:
+        """
+        Return the recognised lines as dicts with text, confidence (0-100) and
+        bbox [left, top, right, bottom], using tesseract page segmentation mode psm.
+        """
+
+class PytesseractEngine(OCREngine):
+    """Runs the tesseract executable once per image through pytesseract."""
+    name = 'pytesseract'
+
+    def image_to_string(self, image: Image.Image, lang: str = 'eng') -> str:
+        return pytesseract.image_to_string(image, lang=lang)
+
+    def image_to_lines(self, image: Image.Image, lang: str = 'eng', psm: int = 6) -> list:
+        data = pytesseract.image_to_data(
+            image, lang=lang, config=f'--psm {psm}', output_type=pytesseract.Output.DICT
+        )
+        # Group words into lines, keeping tesseract's order
+        lines = {}
+        for i, word in enumerate(data['text']):
+            confidence = float(data['conf'][i])
+            if confidence < 0 or not word.strip():
+                continue
+            left, top = data['left'][i], data['top'][i]
+            right, bottom = left + data['width'][i], top + data['height'][i]
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            if key not in lines:
+                lines[key] = {'words': [], 'confidences': [], 'bbox': [left, top, right, bottom]}
+            line = lines[key]
+            line['words'].append(word.strip())
+            line['confidences'].append(confidence)
+            bbox = line['bbox']
+            line['bbox'] = [min(bbox[0], left), min(bbox[1], top), max(bbox[2], right), max(bbox[3], bottom)]
+        return [
+            {
+                'text': ' '.join(line['words']),
+                'confidence': sum(line['confidences']) / len(line['confidences']),
+                'bbox': line['bbox']
+            }
+            for line in lines.values()
+        ]
+
+class TesserocrEngine(OCREngine):
+    """
+    Calls libtesseract in-process through tesserocr. Each thread keeps its own
+    API handle, so traineddata is loaded once per worker instead of per image.
+    """
+    name = 'tesserocr'
+
+    def __init__(self):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+        self._local = threading.local()
+
+    def _api(self, lang: str):
+        """Return this thread's API handle for lang, creating it on first use."""
+        handles = getattr(self._local, 'handles', None)
+        if handles is None:
+            handles = self._local.handles = {}
+        if lang not in handles:
+            handles[lang] = tesserocr.PyTessBaseAPI(lang=lang)
+        return handles[lang]
+
+    def image_to_string(self, image: Image.Image, lang: str = 'eng') -> str:
+        api = self._api(lang)
+        try:
+            api.SetImage(image)
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+
+    def image_to_lines(self, image: Image.Image, lang: str = 'eng', psm: int = 6) -> list:
+        api = self._api(lang)
+        level = tesserocr.RIL.TEXTLINE
+        try:
+            api.SetPageSegMode(psm)
+            api.SetImage(image)
+            api.Recognize()
+            lines = []
+            for item in tesserocr.iterate_level(api.GetIterator(), level):
+                text = item.GetUTF8Text(level)
+                if text and text.strip():
+                    lines.append({
+                        'text': text.strip(),
+                        'confidence': item.Confidence(level),
+                        'bbox': list(item.BoundingBox(level))
+                    })
+            return lines
+        finally:
+            # The handle is reused by image_to_string, which expects automatic segmentation
+            api.SetPageSegMode(tesserocr.PSM.AUTO)
+            api.Clear()
+
+_ENGINES = {
+    PytesseractEngine.name: PytesseractEngine,
+    TesserocrEngine.name: TesserocrEngine,
+}
+_engine = None
+_engine_lock = threading.Lock()
+
+def create_engine(name: str = 'auto') -> OCREngine:
+    """Create an OCR engine by name; "auto" prefers tesserocr when installed."""
+    if name == 'auto':
+        name = TesserocrEngine.name if tesserocr is not None else PytesseractEngine.name
+    if name not in _ENGINES:
+        raise ValueError(f"Unknown OCR engine: {name}")
+    return _ENGINES[name]()
+
+def get_engine() -> OCREngine:
+    """Return the process-wide OCR engine selected by CARDSNAP_OCR_ENGINE."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                try:
+                    _engine = create_engine(OCR_ENGINE)
+                except Exception as e:
+                    logger.warning(f"Falling back to pytesseract: {e}")
+                    _engine = PytesseractEngine()
+    return _engine
+
+def _reset_after_fork():
+    """Make forked pool workers create their own engine and API handles."""
+    global _engine, _engine_lock
+    _engine = None
+    _engine_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Cache settings, overridable from the environment
+QR_CACHE_DIR = os.environ.get('CARDSNAP_QR_CACHE_DIR', 'qr_cache')
+QR_CACHE_MEMORY_ITEMS = int(os.environ.get('CARDSNAP_QR_CACHE_MEMORY_ITEMS', '512'))
+QR_CACHE_MAX_BYTES = int(os.environ.get('CARDSNAP_QR_CACHE_MAX_MB', '32')) * 1024 * 1024
+# Writes between scans of the disk tier for eviction
+QR_CACHE_EVICT_EVERY = 100
+# File extension of each QR format on disk
+QR_CACHE_EXTENSIONS = {'png': '.png', 'png1': '.png', 'svg': '.svg'}
+CACHED_EXTENSIONS = tuple(sorted(set(QR_CACHE_EXTENSIONS.values())))
+
+class QRCache:
+    """Two-tier (in-memory LRU + on-disk PNG and SVG files) cache of rendered QR codes."""
+
+    def __init__(self, directory: str = QR_CACHE_DIR, memory_items: int = QR_CACHE_MEMORY_ITEMS,
+                 max_bytes: int = QR_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    @staticmethod
+    def make_key(payload: str, options: dict, version: Optional[str] = None) -> str:
+        """
+        Build a cache key from the QR payload, the render options and the
+        version of the record it belongs to (its updated_at), so editing a
+        card or company never serves an old image.
+        """
+        digest = hashlib.sha256(payload.encode('utf-8'))
+        digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+        digest.update(str(version or '').encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key: str, fmt: str) -> str:
+        """Disk location of key in format fmt, sharded by its first two hex digits."""
+        return os.path.join(self.directory, key[:2], key + QR_CACHE_EXTENSIONS[fmt])
+
+    def _remember(self, key: str, value: bytes):
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str, fmt: str = 'png') -> Optional[bytes]:
+        """Return the cached image for key, rendered in format fmt, or None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        path = self._path(key, fmt)
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+            # The modification time doubles as the disk tier's last access
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"QR cache read failed: {e}")
+            return None
+        with self._lock:
+            self._remember(key, value)
+        return value
+
+    def set(self, key: str, value: bytes, fmt: str = 'png'):
+        """Store an image in format fmt in both tiers, trimming the disk tier to max_bytes now and then."""
+        with self._lock:
+            self._remember(key, value)
+            self._writes += 1
+            evict = self._writes % QR_CACHE_EVICT_EVERY == 0
+        path = self._path(key, fmt)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+            if evict:
+                self._evict()
+        except OSError as e:
+            logger.warning(f"QR cache write failed: {e}")
+
+    def _evict(self):
+        """Delete least recently used files until the disk tier is under max_bytes."""
+        files = []
+        with os.scandir(self.directory) as shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                with os.scandir(shard.path) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(CACHED_EXTENSIONS):
+                            stat = entry.stat()
+                            files.append((stat.st_mtime, stat.st_size, entry.path))
+        excess = sum(size for _, size, _ in files) - self.max_bytes
+        for _, size, path in sorted(files):
+            if excess <= 0:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            excess -= size
+
+    def clear(self):
+        """Drop every cached QR code from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        if not os.path.isdir(self.directory):
+            return
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.endswith(CACHED_EXTENSIONS):
+                    os.remove(os.path.join(root, filename))
+
+# Create a global instance of QRCache
+qr_cache = QRCache()
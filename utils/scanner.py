@@ -1,230 +1,1156 @@
 import pytesseract
-from PIL import Image
+from PIL import Image, ImageChops, ImageFilter, ImageOps, ImageStat
 import qrcode
 from pyzbar.pyzbar import decode
+import hashlib
 import io
+import json
+import logging
+import math
+import multiprocessing
 import os
-import uuid
-from datetime import datetime
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import Iterable, Iterator, Optional
 import re
+from utils.blob_store import blob_store
+from utils.ocr_cache import OCRCache, ocr_cache
+from utils.ocr_engine import get_engine
+from utils.qr_cache import QRCache, qr_cache
+from utils.thumbnails import create_thumbnails
 
 # Configure pytesseract path
 pytesseract.pytesseract.tesseract_cmd = r'C:\\Program Files\\Tesseract-OCR\\tesseract.exe'
 
-class Scanner:
+logger = logging.getLogger(__name__)
+
+# Options passed to tesseract; part of the OCR cache key
+OCR_CONFIG = {'lang': 'eng'}
+
+# Keys of the parsed card info returned by the text and QR parsers
+CARD_FIELDS = (
+    'name', 'position', 'email', 'phone', 'mobile', 'fax', 'company', 'website',
+    'address', 'city', 'state', 'postal_code', 'country', 'department',
+    'linkedin', 'twitter', 'facebook', 'notes'
+)
+
+# Precompiled patterns used by Scanner._parse_business_card_text. The leading
+# lookarounds only let the regex engine reject start positions sooner; they
+# match exactly what the plain patterns matched
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_PATTERN = re.compile(r'(?=[+(\d])(?:\+?\d{1,3}[-.]?)?\(?\d{3}\)?[-.]?\d{3}[-.]?\d{4}')
+WEBSITE_PATTERN = re.compile(r'(?<![a-zA-Z0-9-])(?:https?:\/\/)?(?:www\.)?([a-zA-Z0-9-]+(?:\.[a-zA-Z]{2,})+)')
+ADDRESS_PATTERN = re.compile(r'\b\d+\s+[A-Za-z0-9\s,.-]+\b')
+POSTAL_CODE_PATTERN = re.compile(r'\b\d{5}(?:-\d{4})?\b')
+# Matched against the lowercased text
+SOCIAL_PATTERNS = {
+    'linkedin': re.compile(r'(?:linkedin\.com/in/|linkedin:?)([a-zA-Z0-9_-]+)'),
+    'twitter': re.compile(r'(?:twitter\.com/|twitter:?)([a-zA-Z0-9_]+)'),
+    'facebook': re.compile(r'(?:facebook\.com/|facebook:?)([a-zA-Z0-9_.]+)')
+}
+COMPANY_INDICATOR_PATTERN = re.compile(r'inc|corp|ltd|llc|company|co\.')
+DEPARTMENT_INDICATOR_PATTERN = re.compile(r'department|dept|division|team')
+
+# Longest side of the downscaled copy searched for a QR code on the fast path
+QR_FAST_PATH_SIZE = 1000
+
+# Social profile URLs found in QR payloads, reduced to the handle like the OCR parser does
+QR_SOCIAL_PATTERNS = {
+    'linkedin': re.compile(r'linkedin\.com/in/([a-zA-Z0-9_-]+)', re.IGNORECASE),
+    'twitter': re.compile(r'(?:twitter\.com|(?<![\w-])x\.com)/([a-zA-Z0-9_]+)', re.IGNORECASE),
+    'facebook': re.compile(r'facebook\.com/([a-zA-Z0-9_.]+)', re.IGNORECASE),
+}
+
+# Region OCR: lines below this confidence are kept but left out of the parsed text
+MIN_LINE_CONFIDENCE = 40
+# Lines that can be a person's name when choosing it by font size and confidence
+NAME_LINE_PATTERN = re.compile(r"[A-Za-z][A-Za-z .'-]*")
+
+# Short side of a standard business card, used to turn a DPI into pixels
+CARD_SHORT_SIDE_INCHES = 2.0
+
+# QR output formats of Scanner.render_qr_code, and the batch size from which
+# Scanner.generate_qr_codes renders in a process pool
+QR_FORMATS = ('png', 'png1', 'svg')
+QR_BATCH_POOL_THRESHOLD = 16
+
+# Process pools are started from the Streamlit process, where card job
+# threads may hold the QR cache or blob store locks at the moment of a fork.
+# Workers started fresh do not inherit locks or database connections.
+POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+# Multi-card photos: longest side of the segmentation mask, and what a card
+# region must look like (share of the frame, long/short side ratio, how much
+# of its minimum-area rectangle its convex hull fills)
+SEGMENT_MAX_SIZE = 400
+CARD_MIN_AREA_FRACTION = 0.02
+CARD_ASPECT_RANGE = (1.2, 2.2)
+CARD_MIN_FILL = 0.9
+
+class ImagePreprocessor:
+    """Configurable clean-up of card photos before they are passed to tesseract."""
+
+    def __init__(self, exif_transpose: bool = True, grayscale: bool = True,
+                 target_dpi: int = None, target_height: int = None,
+                 binarize: bool = False, deskew: bool = False, max_skew: float = 5.0):
+        self.exif_transpose = exif_transpose
+        self.grayscale = grayscale
+        self.target_dpi = target_dpi
+        self.target_height = target_height
+        self.binarize = binarize
+        self.deskew = deskew
+        self.max_skew = max_skew
+
+    @property
+    def config(self) -> dict:
+        """Settings that change the OCR input; part of the OCR cache key."""
+        return {
+            'exif_transpose': self.exif_transpose,
+            'grayscale': self.grayscale,
+            'target_dpi': self.target_dpi,
+            'target_height': self.target_height,
+            'binarize': self.binarize,
+            'deskew': self.deskew,
+            'max_skew': self.max_skew
+        }
+
+    def process(self, image: Image.Image, oriented: bool = False) -> tuple[Image.Image, dict]:
+        """
+        Run the enabled stages in order. Pass oriented=True when EXIF orientation
+        was already applied to the image.
+        Returns (processed_image, timings) with the time of each stage in milliseconds.
+        """
+        stages = [
+            ('exif_transpose', self.exif_transpose and not oriented, ImageOps.exif_transpose),
+            ('grayscale', self.grayscale or self.binarize or self.deskew, self._to_grayscale),
+            ('downscale', bool(self.target_height or self.target_dpi), self._downscale),
+            ('deskew', self.deskew, self._deskew),
+            ('binarize', self.binarize, self._binarize),
+        ]
+        timings = {}
+        for name, enabled, stage in stages:
+            if not enabled:
+                continue
+            started = time.perf_counter()
+            image = stage(image)
+            timings[name] = (time.perf_counter() - started) * 1000
+        logger.debug(f"Preprocessing timings (ms): {timings}")
+        return image, timings
+
     @staticmethod
-    def detect_text(image_bytes: bytes) -> str:
-        """Extract text from image using OCR."""
+    def _to_grayscale(image: Image.Image) -> Image.Image:
+        """Convert to 8-bit grayscale, flattening transparency onto white."""
+        if image.mode == 'L':
+            return image
+        if image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info:
+            rgba = image.convert('RGBA')
+            background = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+            image = Image.alpha_composite(background, rgba)
+        return image.convert('L')
+
+    def _downscale(self, image: Image.Image) -> Image.Image:
+        """Shrink the short side to the target height; never upscale."""
+        target = self.target_height or int(self.target_dpi * CARD_SHORT_SIDE_INCHES)
+        short_side = min(image.size)
+        if short_side <= target:
+            return image
+        scale = target / short_side
+        new_size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        return image.resize(new_size, Image.LANCZOS)
+
+    @staticmethod
+    def _otsu_threshold(histogram: list) -> int:
+        """Pick the threshold that maximises between-class variance."""
+        total = sum(histogram)
+        sum_all = sum(i * count for i, count in enumerate(histogram))
+        sum_background, weight_background = 0, 0
+        best_threshold, best_variance = 127, 0.0
+        for i, count in enumerate(histogram):
+            weight_background += count
+            if weight_background == 0:
+                continue
+            weight_foreground = total - weight_background
+            if weight_foreground == 0:
+                break
+            sum_background += i * count
+            mean_background = sum_background / weight_background
+            mean_foreground = (sum_all - sum_background) / weight_foreground
+            variance = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+            if variance > best_variance:
+                best_threshold, best_variance = i, variance
+        return best_threshold
+
+    def _binarize(self, image: Image.Image) -> Image.Image:
+        """Threshold to black and white using Otsu's method."""
+        threshold = self._otsu_threshold(image.histogram()[:256])
+        return image.point([0] * (threshold + 1) + [255] * (255 - threshold))
+
+    def _deskew(self, image: Image.Image) -> Image.Image:
+        """Rotate so text lines are horizontal, using a row projection profile."""
+        # Score an edge map so text outweighs large flat graphics, and drop
+        # the border so card and frame edges do not dominate the profile
+        sample = image.copy()
+        sample.thumbnail((600, 600))
+        sample = sample.filter(ImageFilter.FIND_EDGES)
+        margin_x, margin_y = sample.width // 8, sample.height // 8
+        sample = sample.crop((margin_x, margin_y, sample.width - margin_x, sample.height - margin_y))
+        
+        best_angle, best_score = 0.0, -1.0
+        steps = int(self.max_skew * 2)
+        for step in range(-steps, steps + 1):
+            angle = step / 2
+            rotated = sample.rotate(angle, resample=Image.BILINEAR)
+            # Collapsing each row to its mean gives the projection profile
+            profile = rotated.resize((1, rotated.height), Image.BOX)
+            score = ImageStat.Stat(profile).var[0]
+            if score > best_score:
+                best_angle, best_score = angle, score
+        
+        if best_angle == 0.0:
+            return image
+        return image.rotate(best_angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+
+# Downscaling assumes the photo is filled by the card, so it is opt-in until
+# benchmarks/preprocess.py shows no field changes on real scans; 300 is a
+# sensible value (CARDSNAP_OCR_TARGET_DPI, 0 to keep full resolution)
+OCR_TARGET_DPI = int(os.environ.get('CARDSNAP_OCR_TARGET_DPI', '0')) or None
+
+# Preprocessing applied by Scanner.detect_text
+DEFAULT_PREPROCESSOR = ImagePreprocessor(target_dpi=OCR_TARGET_DPI)
+
+def _merge_runs(flags: list, max_gap: int, min_length: int) -> list:
+    """Return (start, end) spans of True flags, bridging gaps of up to max_gap."""
+    spans = []
+    start = last = None
+    for i, flag in enumerate(flags):
+        if not flag:
+            continue
+        if start is None:
+            start = i
+        elif i - last - 1 > max_gap:
+            spans.append((start, last + 1))
+            start = i
+        last = i
+    if start is not None:
+        spans.append((start, last + 1))
+    return [(a, b) for a, b in spans if b - a >= min_length]
+
+def find_text_blocks(image: Image.Image, max_size: int = 800) -> list:
+    """
+    Cheap layout pass for region OCR. Rows dense in edges form text bands, and
+    each band is split into blocks at wide horizontal gaps. Returns padded
+    (left, top, right, bottom) boxes in image coordinates, top to bottom and
+    left to right.
+    """
+    scale = min(1.0, max_size / max(image.size))
+    small = ImagePreprocessor._to_grayscale(image)
+    if scale < 1.0:
+        small = small.resize((round(image.width * scale), round(image.height * scale)), Image.BOX)
+    edges = small.filter(ImageFilter.FIND_EDGES).point([0] * 41 + [255] * 215)
+    
+    # Mean edge value per row; roughly 2.5% edge pixels marks a text row
+    row_profile = edges.resize((1, edges.height), Image.BOX).tobytes()
+    blocks = []
+    for top, bottom in _merge_runs([v > 6 for v in row_profile], max_gap=1, min_length=4):
+        band = edges.crop((0, top, edges.width, bottom))
+        column_profile = band.resize((band.width, 1), Image.BOX).tobytes()
+        height = bottom - top
+        for left, right in _merge_runs([v > 0 for v in column_profile], max_gap=height, min_length=2):
+            # Text is wider than tall; narrow slivers are graphics edges
+            if right - left < height:
+                continue
+            pad = max(2, height // 4)
+            blocks.append((
+                max(0, round((left - pad) / scale)),
+                max(0, round((top - pad) / scale)),
+                min(image.width, round((right + pad) / scale)),
+                min(image.height, round((bottom + pad) / scale))
+            ))
+    return blocks
+
+def _label_regions(mask: bytes, width: int) -> list:
+    """Return the 4-connected foreground regions of mask as lists of pixel indexes."""
+    seen = bytearray(len(mask))
+    regions = []
+    start = mask.find(255)
+    while start != -1:
+        if not seen[start]:
+            seen[start] = 1
+            stack, pixels = [start], []
+            while stack:
+                p = stack.pop()
+                pixels.append(p)
+                x = p % width
+                for q in (p - width, p + width, p - 1 if x else -1, p + 1 if x < width - 1 else -1):
+                    if 0 <= q < len(mask) and mask[q] and not seen[q]:
+                        seen[q] = 1
+                        stack.append(q)
+            regions.append(pixels)
+        start = mask.find(255, start + 1)
+    return regions
+
+def _convex_hull(points: list) -> list:
+    """Monotone chain convex hull, counter-clockwise."""
+    points = sorted(set(points))
+    if len(points) < 3:
+        return points
+    
+    def half(sequence):
+        hull = []
+        for p in sequence:
+            while len(hull) >= 2 and ((hull[-1][0] - hull[-2][0]) * (p[1] - hull[-2][1])
+                                      - (hull[-1][1] - hull[-2][1]) * (p[0] - hull[-2][0])) <= 0:
+                hull.pop()
+            hull.append(p)
+        return hull[:-1]
+    return half(points) + half(reversed(points))
+
+def _card_quad(hull: list) -> tuple[list, float]:
+    """
+    Fit the minimum-area rectangle to a convex hull (rotating calipers) and
+    snap each of its corners to the nearest hull point, so perspective
+    distortion is followed. Returns the quad as upper-left, lower-left,
+    lower-right, upper-right and the rectangle's fill ratio denominator (area).
+    """
+    best = None
+    for i in range(len(hull)):
+        (x1, y1), (x2, y2) = hull[i], hull[(i + 1) % len(hull)]
+        angle = math.atan2(y2 - y1, x2 - x1)
+        # Keep the rectangle's u axis within 45 degrees of horizontal so the
+        # card comes out the way it was photographed
+        angle = (angle + math.pi / 4) % (math.pi / 2) - math.pi / 4
+        cos_a, sin_a = math.cos(angle), math.sin(angle)
+        us = [x * cos_a + y * sin_a for x, y in hull]
+        vs = [-x * sin_a + y * cos_a for x, y in hull]
+        area = (max(us) - min(us)) * (max(vs) - min(vs))
+        if best is None or area < best[0]:
+            best = (area, cos_a, sin_a, min(us), max(us), min(vs), max(vs))
+    area, cos_a, sin_a, u_min, u_max, v_min, v_max = best
+    quad = []
+    for u, v in ((u_min, v_min), (u_min, v_max), (u_max, v_max), (u_max, v_min)):
+        corner = (u * cos_a - v * sin_a, u * sin_a + v * cos_a)
+        quad.append(min(hull, key=lambda p: (p[0] - corner[0]) ** 2 + (p[1] - corner[1]) ** 2))
+    return quad, area
+
+def find_cards(image: Image.Image, max_size: int = SEGMENT_MAX_SIZE) -> list:
+    """
+    Find card-shaped regions in a photo of several cards on a table. Working
+    on a downscaled copy, pixels that differ from the table colour are
+    separated into regions, and each region that is the size and shape of a
+    card becomes a quad (upper-left, lower-left, lower-right, upper-right) in
+    image coordinates, ordered top to bottom, left to right.
+    """
+    scale = min(1.0, max_size / max(image.size))
+    small = image.convert('RGB').resize(
+        (max(1, round(image.width * scale)), max(1, round(image.height * scale))), Image.BOX
+    ).filter(ImageFilter.GaussianBlur(1))
+    width, height = small.size
+    
+    # The frame border is mostly table: its median colour is the background,
+    # and anything further from it than the table's own texture is card. The
+    # Otsu split of the distance caps the threshold on busy tables
+    border = Image.new('RGB', (2 * (width + height), 1))
+    border.paste(small.crop((0, 0, width, 1)), (0, 0))
+    border.paste(small.crop((0, height - 1, width, height)), (width, 0))
+    border.paste(small.crop((0, 0, 1, height)).transpose(Image.Transpose.ROTATE_90), (2 * width, 0))
+    border.paste(small.crop((width - 1, 0, width, height)).transpose(Image.Transpose.ROTATE_90), (2 * width + height, 0))
+    border_stat = ImageStat.Stat(border)
+    table = tuple(int(v) for v in border_stat.median)
+    distance = ImageChops.difference(small, Image.new('RGB', small.size, table)).convert('L')
+    texture = 3 * max(border_stat.stddev)
+    threshold = min(ImagePreprocessor._otsu_threshold(distance.histogram()[:256]), max(16, round(texture)))
+    mask = distance.point([0] * (threshold + 1) + [255] * (255 - threshold))
+    
+    # Open to cut thin bridges between cards and drop specks. Holes left by
+    # text or artwork do not matter: regions are judged by their convex hull
+    mask = mask.filter(ImageFilter.MinFilter(3)).filter(ImageFilter.MaxFilter(3))
+    
+    cards = []
+    for pixels in _label_regions(mask.tobytes(), width):
+        if len(pixels) < CARD_MIN_AREA_FRACTION * width * height:
+            continue
+        # Row extremes are enough to build the hull of a region
+        rows = {}
+        for p in pixels:
+            y, x = divmod(p, width)
+            low, high = rows.get(y, (x, x))
+            rows[y] = (min(low, x), max(high, x + 1))
+        points = [(x, y) for y, (low, high) in rows.items() for x in (low, high)]
+        points += [(x, y + 1) for y, (low, high) in rows.items() for x in (low, high)]
+        hull = _convex_hull(points)
+        quad, area = _card_quad(hull)
+        sides = sorted((
+            math.dist(quad[0], quad[3]) + math.dist(quad[1], quad[2]),
+            math.dist(quad[0], quad[1]) + math.dist(quad[3], quad[2])
+        ))
+        # A card's outline is a rectangle even when parts of its face match the table
+        hull_area = abs(sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(hull, hull[1:] + hull[:1]))) / 2
+        if not area or hull_area / area < CARD_MIN_FILL:
+            continue
+        if not CARD_ASPECT_RANGE[0] <= sides[1] / max(sides[0], 1) <= CARD_ASPECT_RANGE[1]:
+            continue
+        cards.append([(x / scale, y / scale) for x, y in quad])
+    
+    # Reading order by row, using half a card height as the row tolerance
+    row_height = max((abs(q[1][1] - q[0][1]) for q in cards), default=1) / 2
+    cards.sort(key=lambda q: (round(min(y for _, y in q) / row_height), min(x for x, _ in q)))
+    return cards
+
+def crop_card(image: Image.Image, quad: list) -> Image.Image:
+    """Cut a card out of a photo and map its quad onto an upright rectangle."""
+    (ul, ll, lr, ur) = quad
+    width = round((math.dist(ul, ur) + math.dist(ll, lr)) / 2)
+    height = round((math.dist(ul, ll) + math.dist(ur, lr)) / 2)
+    data = [coordinate for corner in quad for coordinate in corner]
+    return image.transform((max(1, width), max(1, height)), Image.QUAD, data, Image.BICUBIC)
+
+class ScanJob:
+    """
+    One uploaded card image, decoded once and shared by OCR, QR scanning and storage.
+    Derived images are computed lazily and kept for the lifetime of the job.
+    """
+
+    def __init__(self, image_bytes: bytes, preprocessor: ImagePreprocessor = None):
+        self.image_bytes = image_bytes
+        self.preprocessor = preprocessor or DEFAULT_PREPROCESSOR
+        self.timings = {}
+        self._digest = None
+        self._image = None
+        self._gray = None
+        self._gray_buffer = None
+        self._small_gray_image = None
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 of the uploaded bytes."""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.image_bytes).hexdigest()
+        return self._digest
+
+    @property
+    def image(self) -> Image.Image:
+        """The decoded upload with EXIF orientation applied."""
+        if self._image is None:
+            started = time.perf_counter()
+            image = Image.open(io.BytesIO(self.image_bytes))
+            image.load()
+            if self.preprocessor.exif_transpose:
+                image = ImageOps.exif_transpose(image)
+            self._image = image
+            self.timings['decode'] = (time.perf_counter() - started) * 1000
+        return self._image
+
+    @property
+    def gray(self) -> Image.Image:
+        """8-bit grayscale version of image."""
+        if self._gray is None:
+            self._gray = ImagePreprocessor._to_grayscale(self.image)
+        return self._gray
+
+    @property
+    def gray_buffer(self) -> bytes:
+        """Raw pixels of gray, handed to zbar as-is without another conversion."""
+        if self._gray_buffer is None:
+            self._gray_buffer = self.gray.tobytes()
+        return self._gray_buffer
+
+    def detect_text(self) -> str:
+        """Extract text from the image using OCR, served from the OCR cache when possible."""
         try:
-            image = Image.open(io.BytesIO(image_bytes))
-            text = pytesseract.image_to_string(image, lang='eng')
+            engine = get_engine()
+            cache_key = OCRCache.make_key(
+                self.digest,
+                {**OCR_CONFIG, 'engine': engine.name, 'preprocess': self.preprocessor.config}
+            )
+            cached_text = ocr_cache.get(cache_key)
+            if cached_text is not None:
+                return cached_text
+            
+            source = self.gray if self.preprocessor.grayscale else self.image
+            image, timings = self.preprocessor.process(source, oriented=True)
+            self.timings.update(timings)
+            
+            started = time.perf_counter()
+            text = engine.image_to_string(image, **OCR_CONFIG)
+            self.timings['ocr'] = (time.perf_counter() - started) * 1000
+            
+            ocr_cache.set(cache_key, text)
             return text
         except Exception as e:
             raise Exception(f"Error detecting text: {str(e)}")
 
-    @staticmethod
-    def extract_text_from_image(image_bytes: bytes) -> tuple[str, dict]:
+    def extract_text(self) -> tuple[str, dict]:
         """
-        Extract text from image using OCR and parse business card information.
+        Extract text using OCR and parse business card information.
         Returns (raw_text, parsed_info)
         """
         try:
-            raw_text = Scanner.detect_text(image_bytes)
+            raw_text = self.detect_text()
+            return raw_text, Scanner._parse_business_card_text(raw_text)
+        except Exception as e:
+            raise Exception(f"Error processing image: {str(e)}")
+
+    def _small_gray(self, max_size: int) -> Image.Image:
+        """Grayscale copy whose longest side is at most max_size."""
+        if self._small_gray_image is None or max(self._small_gray_image.size) > max_size:
+            factor = -(-max(self.image.size) // max_size)
+            self._small_gray_image = ImagePreprocessor._to_grayscale(self.image.reduce(factor))
+        return self._small_gray_image
+
+    def detect_lines(self, max_workers: int = None) -> list:
+        """
+        Region-based OCR: find text blocks with a cheap layout pass and OCR them
+        concurrently, single-line blocks with a single-line segmentation mode.
+        Returns lines in reading order as dicts with text, confidence (0-100)
+        and bbox [left, top, right, bottom] in pixels of image.
+        """
+        try:
+            engine = get_engine()
+            cache_key = OCRCache.make_key(
+                self.digest,
+                {**OCR_CONFIG, 'engine': engine.name, 'mode': 'lines', 'preprocess': self.preprocessor.config}
+            )
+            cached_lines = ocr_cache.get(cache_key)
+            if cached_lines is not None:
+                return json.loads(cached_lines)
             
-            # Parse the extracted text
-            parsed_info = Scanner._parse_business_card_text(raw_text)
+            source = self.gray if self.preprocessor.grayscale else self.image
+            image, timings = self.preprocessor.process(source, oriented=True)
+            self.timings.update(timings)
             
-            return raw_text, parsed_info
+            started = time.perf_counter()
+            blocks = find_text_blocks(image)
+            self.timings['layout'] = (time.perf_counter() - started) * 1000
+            # Without any block, fall back to automatic segmentation of the whole image
+            psms = [3]
+            if blocks:
+                line_height = statistics.median(bottom - top for _, top, _, bottom in blocks)
+                psms = [7 if bottom - top <= 1.5 * line_height else 6 for _, top, _, bottom in blocks]
+            else:
+                blocks = [(0, 0, image.width, image.height)]
+            
+            def ocr_block(block, psm):
+                lines = engine.image_to_lines(image.crop(block), psm=psm, **OCR_CONFIG)
+                for line in lines:
+                    line['bbox'] = [v + block[i % 2] for i, v in enumerate(line['bbox'])]
+                return lines
+            
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+                block_lines = list(executor.map(ocr_block, blocks, psms))
+            self.timings['ocr'] = (time.perf_counter() - started) * 1000
+            
+            # Report boxes in the coordinates of the oriented upload
+            scale_x = self.image.width / image.width
+            scale_y = self.image.height / image.height
+            lines = [
+                {
+                    'text': line['text'],
+                    'confidence': round(line['confidence'], 1),
+                    'bbox': [round(line['bbox'][0] * scale_x), round(line['bbox'][1] * scale_y),
+                             round(line['bbox'][2] * scale_x), round(line['bbox'][3] * scale_y)]
+                }
+                for lines in block_lines for line in lines
+            ]
             
+            ocr_cache.set(cache_key, json.dumps(lines))
+            return lines
+        except Exception as e:
+            raise Exception(f"Error detecting text: {str(e)}")
+
+    def extract_lines(self, max_workers: int = None) -> tuple[str, dict, list]:
+        """
+        Region-based variant of extract_text.
+        Returns (raw_text, parsed_info, ocr_lines)
+        """
+        try:
+            lines = self.detect_lines(max_workers)
+            raw_text, parsed_info = Scanner._parse_ocr_lines(lines)
+            return raw_text, parsed_info, lines
         except Exception as e:
             raise Exception(f"Error processing image: {str(e)}")
+
+    def scan_qr_code(self, max_size: int = None) -> Optional[str]:
+        """
+        Scan a QR code and return decoded data. With max_size, a downscaled copy
+        is searched instead of the full-resolution grayscale buffer.
+        """
+        try:
+            if max_size and max(self.image.size) > max_size:
+                gray = self._small_gray(max_size)
+                buffer = gray.tobytes()
+            else:
+                gray, buffer = self.gray, self.gray_buffer
+            decoded_objects = decode((buffer, gray.width, gray.height))
+            if decoded_objects:
+                return decoded_objects[0].data.decode('utf-8')
+            return None
+        except Exception as e:
+            raise Exception(f"Error scanning QR code: {str(e)}")
+
+    def scan_contact_qr(self) -> tuple[Optional[str], Optional[dict]]:
+        """
+        Fast path run before OCR: look for a vCard or MeCard QR code on a downscaled copy.
+        Returns (qr_code_data, parsed_info); parsed_info is None unless the payload is a contact.
+        """
+        qr_data = self.scan_qr_code(max_size=QR_FAST_PATH_SIZE)
+        if not qr_data:
+            return None, None
+        return qr_data, Scanner.parse_contact_qr(qr_data)
+
+    def split_cards(self) -> list:
+        """
+        Split a photo of several cards into one encoded image per card. A photo
+        in which fewer than two cards are found is returned unchanged as [image_bytes].
+        """
+        started = time.perf_counter()
+        quads = find_cards(self.image)
+        self.timings['segment'] = (time.perf_counter() - started) * 1000
+        if len(quads) < 2:
+            return [self.image_bytes]
+        
+        crops = []
+        for quad in quads:
+            crop = crop_card(self.image, quad)
+            buffer = io.BytesIO()
+            if crop.mode in ('RGBA', 'LA', 'P'):
+                crop.save(buffer, format='PNG')
+            else:
+                crop.convert('RGB').save(buffer, format='JPEG', quality=95)
+            crops.append(buffer.getvalue())
+        return crops
+
+    def save_image(self, directory: str = "uploads") -> str:
+        """Save the upload in the archival format and return the file path."""
+        try:
+            # self.image is only upright when the preprocessor applied EXIF orientation
+            image = self.image if self.preprocessor.exif_transpose else None
+            path = blob_store(directory).put_upload(self.image_bytes, image, self.digest)
+        except Exception as e:
+            raise Exception(f"Error saving image: {str(e)}")
+        _save_thumbnails(path, self.image)
+        return path
+
+def _save_thumbnails(path: str, image: Image.Image = None):
+    """Create list-view thumbnails at save time; a failure only defers them to first view."""
+    try:
+        create_thumbnails(path, image)
+    except Exception as e:
+        logger.warning(f"Could not create thumbnails for {path}: {e}")
+
+def _qr_options(box_size: int, border: int, fmt: str, size: Optional[int]) -> dict:
+    """Validate QR render options and return them as used in the QR cache key."""
+    if fmt not in QR_FORMATS:
+        raise ValueError(f"Unknown QR format: {fmt}")
+    options = {'box_size': box_size, 'border': border}
+    if fmt != 'png':
+        # Left out for plain PNGs so entries cached before formats existed stay valid
+        options.update(fmt=fmt, size=size)
+    return options
+
+def _render_qr(qr_data: str, box_size: int, border: int, fmt: str, size: Optional[int]) -> bytes:
+    """Encode and draw one QR code; module level so Scanner.generate_qr_codes can pool it."""
+    # Generate QR code
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(qr_data)
+    qr.make(fit=True)
+    
+    if fmt == 'png':
+        # Create QR code image
+        qr_image = qr.make_image(fill_color="black", back_color="white")
+        img_byte_arr = io.BytesIO()
+        qr_image.save(img_byte_arr, format='PNG')
+        return img_byte_arr.getvalue()
+    
+    # The module matrix includes the quiet zone
+    matrix = qr.get_matrix()
+    modules = len(matrix)
+    
+    if fmt == 'svg':
+        # One path with a rectangle per horizontal run of dark modules
+        runs = []
+        for y, row in enumerate(matrix):
+            x = 0
+            while x < modules:
+                if row[x]:
+                    start = x
+                    while x < modules and row[x]:
+                        x += 1
+                    runs.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+                else:
+                    x += 1
+        width = size or modules * box_size
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{width}" '
+            f'viewBox="0 0 {modules} {modules}" shape-rendering="crispEdges">'
+            f'<rect width="{modules}" height="{modules}" fill="#fff"/>'
+            f'<path d="{"".join(runs)}" fill="#000"/></svg>'
+        ).encode('utf-8')
+    
+    # 1-bit PNG: whole pixels per module, centred on a white canvas of the requested size
+    target = size or modules * box_size
+    scale = max(1, target // modules)
+    pixels = bytes(0 if dark else 255 for row in matrix for dark in row)
+    image = Image.frombytes('L', (modules, modules), pixels).convert('1')
+    image = image.resize((modules * scale, modules * scale), Image.NEAREST)
+    if image.width < target:
+        canvas = Image.new('1', (target, target), 1)
+        offset = (target - image.width) // 2
+        canvas.paste(image, (offset, offset))
+        image = canvas
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+class Scanner:
+    @staticmethod
+    def detect_text(image_bytes: bytes) -> str:
+        """Extract text from image using OCR."""
+        return ScanJob(image_bytes).detect_text()
+
+    @staticmethod
+    def extract_text_from_image(image_bytes: bytes) -> tuple[str, dict]:
+        """
+        Extract text from image using OCR and parse business card information.
+        OCR results are served from the OCR cache when the same image was seen before.
+        Returns (raw_text, parsed_info)
+        """
+        return ScanJob(image_bytes).extract_text()
+    
+    @staticmethod
+    def extract_lines_from_image(image_bytes: bytes, max_workers: int = None) -> tuple[str, dict, list]:
+        """
+        Extract text block by block in parallel, with per-line confidence and bounding boxes.
+        Returns (raw_text, parsed_info, ocr_lines)
+        """
+        return ScanJob(image_bytes).extract_lines(max_workers)
     
     @staticmethod
     def _parse_business_card_text(text: str) -> dict:
         """Parse business card text to extract structured information."""
-        info = {
-            'name': None,
-            'position': None,
-            'email': None,
-            'phone': None,
-            'mobile': None,
-            'fax': None,
-            'company': None,
-            'website': None,
-            'address': None,
-            'city': None,
-            'state': None,
-            'postal_code': None,
-            'country': None,
-            'department': None,
-            'linkedin': None,
-            'twitter': None,
-            'facebook': None,
-            'notes': None
-        }
-        
-        # Split text into lines and remove empty lines
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        info = dict.fromkeys(CARD_FIELDS)
         
         # Extract email addresses
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        emails = re.findall(email_pattern, text)
-        if emails:
-            info['email'] = emails[0]
-        
-        # Extract phone numbers
-        phone_pattern = r'(?:\+?\d{1,3}[-.]?)?\(?\d{3}\)?[-.]?\d{3}[-.]?\d{4}'
-        phones = re.findall(phone_pattern, text)
-        if phones:
-            # Assume first number is primary phone
-            info['phone'] = phones[0]
-            # If there are multiple numbers, assume second is mobile
-            if len(phones) > 1:
-                info['mobile'] = phones[1]
-            # If there are three numbers, assume third is fax
-            if len(phones) > 2:
-                info['fax'] = phones[2]
+        match = EMAIL_PATTERN.search(text)
+        if match:
+            info['email'] = match.group(0)
+        
+        # Extract phone numbers: primary phone, then mobile, then fax
+        phones = [m.group(0) for m in islice(PHONE_PATTERN.finditer(text), 3)]
+        for key, phone in zip(('phone', 'mobile', 'fax'), phones):
+            info[key] = phone
         
         # Extract website
-        website_pattern = r'(?:https?:\/\/)?(?:www\.)?([a-zA-Z0-9-]+(?:\.[a-zA-Z]{2,})+)'
-        websites = re.findall(website_pattern, text)
-        if websites:
-            info['website'] = websites[0]
+        match = WEBSITE_PATTERN.search(text)
+        if match:
+            info['website'] = match.group(1)
         
         # Extract social media handles
-        social_patterns = {
-            'linkedin': r'(?:linkedin\.com/in/|linkedin:?)([a-zA-Z0-9_-]+)',
-            'twitter': r'(?:twitter\.com/|twitter:?)([a-zA-Z0-9_]+)',
-            'facebook': r'(?:facebook\.com/|facebook:?)([a-zA-Z0-9_.]+)'
-        }
-        for platform, pattern in social_patterns.items():
-            matches = re.findall(pattern, text.lower())
-            if matches:
-                info[platform] = matches[0]
+        lower_text = text.lower()
+        for platform, pattern in SOCIAL_PATTERNS.items():
+            match = pattern.search(lower_text)
+            if match:
+                info[platform] = match.group(1)
         
         # Extract address components
-        address_pattern = r'\b\d+\s+[A-Za-z0-9\s,.-]+\b'
-        addresses = re.findall(address_pattern, text)
-        if addresses:
-            info['address'] = addresses[0]
+        match = ADDRESS_PATTERN.search(text)
+        if match:
+            info['address'] = match.group(0)
         
         # Try to identify postal code
-        postal_pattern = r'\b\d{5}(?:-\d{4})?\b'
-        postal_codes = re.findall(postal_pattern, text)
-        if postal_codes:
-            info['postal_code'] = postal_codes[0]
-        
-        # Try to identify name and position
-        # Usually, name is in larger font and appears first
-        if lines:
-            info['name'] = lines[0]
-            if len(lines) > 1:
-                info['position'] = lines[1]
-        
-        # Try to identify company name
-        # Often appears after position or in larger font
-        company_indicators = ['inc', 'corp', 'ltd', 'llc', 'company', 'co.']
-        for line in lines:
-            lower_line = line.lower()
-            if any(indicator in lower_line for indicator in company_indicators):
-                info['company'] = line
-                break
+        match = POSTAL_CODE_PATTERN.search(text)
+        if match:
+            info['postal_code'] = match.group(0)
         
-        # Try to identify department
-        department_indicators = ['department', 'dept', 'division', 'team']
-        for line in lines:
-            lower_line = line.lower()
-            if any(indicator in lower_line for indicator in department_indicators):
-                info['department'] = line
-                break
+        # Usually, name is in larger font and appears first, followed by position
+        lines = text.split('\n')
+        head = list(islice(filter(None, map(str.strip, lines)), 2))
+        if head:
+            info['name'] = head[0]
+            if len(head) > 1:
+                info['position'] = head[1]
+        
+        # Company and department are the first lines containing one of their
+        # indicator words; one search of the lowercased text finds each line
+        for key, pattern in (('company', COMPANY_INDICATOR_PATTERN),
+                             ('department', DEPARTMENT_INDICATOR_PATTERN)):
+            match = pattern.search(lower_text)
+            if match:
+                info[key] = lines[lower_text.count('\n', 0, match.start())].strip()
+        
+        return info
+
+    @staticmethod
+    def _parse_ocr_lines(lines: list) -> tuple[str, dict]:
+        """
+        Parse region OCR lines. Low-confidence lines are dropped, and the name is
+        the tallest confident name-like line rather than simply the first line.
+        Returns (raw_text, parsed_info)
+        """
+        confident = [line for line in lines if line['confidence'] >= MIN_LINE_CONFIDENCE]
+        raw_text = '\n'.join(line['text'] for line in confident)
+        info = Scanner._parse_business_card_text(raw_text)
+        
+        best_index, best_score = None, 0.0
+        for index, line in enumerate(confident):
+            if not NAME_LINE_PATTERN.fullmatch(line['text']):
+                continue
+            height = line['bbox'][3] - line['bbox'][1]
+            score = height * line['confidence']
+            # Names are usually two to four words
+            if 2 <= len(line['text'].split()) <= 4:
+                score *= 1.5
+            if score > best_score:
+                best_index, best_score = index, score
+        
+        if best_index is not None:
+            info['name'] = confident[best_index]['text']
+            following = confident[best_index + 1:best_index + 2]
+            info['position'] = following[0]['text'] if following else None
+        return raw_text, info
+
+    @staticmethod
+    def parse_contact_qr(payload: str) -> Optional[dict]:
+        """
+        Parse a vCard or MeCard QR payload into the same keys as _parse_business_card_text.
+        Returns None when the payload is not a contact.
+        """
+        stripped = payload.strip()
+        if stripped.upper().startswith('BEGIN:VCARD'):
+            info = Scanner._parse_vcard(stripped)
+        elif stripped.upper().startswith('MECARD:'):
+            info = Scanner._parse_mecard(stripped[len('MECARD:'):])
+        else:
+            return None
+        return info if any(info.values()) else None
+
+    @staticmethod
+    def _split_escaped(value: str, separator: str = None) -> list:
+        """
+        Unescape a vCard or MeCard value, splitting on unescaped separator
+        when one is given.
+        """
+        parts, current, escaped = [], [], False
+        for char in value:
+            if escaped:
+                current.append('\n' if char in 'nN' else char)
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == separator:
+                parts.append(''.join(current))
+                current = []
+            else:
+                current.append(char)
+        parts.append(''.join(current))
+        return parts
+
+    @staticmethod
+    def _set_contact_url(info: dict, url: str):
+        """Store a URL as a social handle when it is a known profile, else as the website."""
+        for platform, pattern in QR_SOCIAL_PATTERNS.items():
+            match = pattern.search(url)
+            if match:
+                info[platform] = info[platform] or match.group(1).lower()
+                return
+        info['website'] = info['website'] or url
+
+    @staticmethod
+    def _set_contact_phone(info: dict, number: str, kind: str = ''):
+        """Store a phone number as phone, mobile or fax, filling phone then mobile."""
+        if 'FAX' in kind:
+            info['fax'] = info['fax'] or number
+        elif 'CELL' in kind and not info['mobile']:
+            info['mobile'] = number
+        elif not info['phone']:
+            info['phone'] = number
+        elif not info['mobile']:
+            info['mobile'] = number
+
+    @staticmethod
+    def _parse_vcard(payload: str) -> dict:
+        """Parse a vCard 2.1/3.0/4.0 payload."""
+        info = dict.fromkeys(CARD_FIELDS)
+        structured_name = None
+        # Unfold continuation lines before splitting into properties
+        for line in re.sub(r'\r?\n[ \t]', '', payload).splitlines():
+            if ':' not in line:
+                continue
+            head, value = line.split(':', 1)
+            if not value.strip():
+                continue
+            params = head.split(';')
+            prop = params[0].split('.')[-1].upper()
+            kind = ';'.join(params[1:]).upper()
+            
+            if prop == 'FN':
+                info['name'] = Scanner._split_escaped(value, ';')[0].strip()
+            elif prop == 'N':
+                components = [c.strip() for c in Scanner._split_escaped(value, ';')]
+                # N is family;given;additional;prefix;suffix
+                ordered = components[3:4] + components[1:3] + components[0:1] + components[4:5]
+                structured_name = ' '.join(c for c in ordered if c)
+            elif prop == 'TITLE':
+                info['position'] = value.strip()
+            elif prop == 'ROLE':
+                info['position'] = info['position'] or value.strip()
+            elif prop == 'ORG':
+                components = [c.strip() for c in Scanner._split_escaped(value, ';')]
+                info['company'] = components[0] or None
+                if len(components) > 1 and components[1]:
+                    info['department'] = components[1]
+            elif prop == 'EMAIL':
+                info['email'] = info['email'] or value.strip()
+            elif prop == 'TEL':
+                Scanner._set_contact_phone(info, value.strip(), kind)
+            elif prop in ('URL', 'X-SOCIALPROFILE'):
+                Scanner._set_contact_url(info, value.strip())
+            elif prop == 'ADR':
+                # ADR is pobox;extended;street;locality;region;code;country
+                components = [c.strip() for c in Scanner._split_escaped(value, ';')] + [''] * 7
+                info['address'] = components[2] or None
+                info['city'] = components[3] or None
+                info['state'] = components[4] or None
+                info['postal_code'] = components[5] or None
+                info['country'] = components[6] or None
+            elif prop == 'NOTE':
+                info['notes'] = Scanner._split_escaped(value)[0].strip()
         
+        if not info['name'] and structured_name:
+            info['name'] = structured_name
+        return info
+
+    @staticmethod
+    def _parse_mecard(payload: str) -> dict:
+        """Parse the body of a MECARD: payload."""
+        info = dict.fromkeys(CARD_FIELDS)
+        for field in Scanner._split_escaped(payload, ';'):
+            if ':' not in field:
+                continue
+            key, value = field.split(':', 1)
+            key, value = key.strip().upper(), value.strip()
+            if not value:
+                continue
+            
+            if key == 'N':
+                # MeCard names are written "Family,Given"
+                family, _, given = value.partition(',')
+                info['name'] = ' '.join(p.strip() for p in (given, family) if p.strip())
+            elif key == 'TITLE':
+                info['position'] = value
+            elif key == 'ORG':
+                info['company'] = value
+            elif key == 'EMAIL':
+                info['email'] = info['email'] or value
+            elif key == 'TEL':
+                Scanner._set_contact_phone(info, value)
+            elif key == 'URL':
+                Scanner._set_contact_url(info, value)
+            elif key == 'ADR':
+                info['address'] = value
+            elif key == 'NOTE':
+                info['notes'] = value
         return info
     
     @staticmethod
     def scan_qr_code(image_bytes: bytes) -> str:
         """Scan QR code from image and return decoded data."""
+        return ScanJob(image_bytes).scan_qr_code()
+    
+    @staticmethod
+    def qr_payload(data: dict) -> str:
+        """Build the text encoded in the QR code for business card or company data."""
+        if data.get('type') == 'business_card' and 'raw_text' in data:
+            # For business cards with raw text, use the raw text directly
+            return data['raw_text']
+        elif data.get('type') == 'company':
+            # For company data, create a formatted string
+            company_info = []
+            for key, value in data.items():
+                if key != 'type' and value:  # Skip 'type' field and None values
+                    # Convert key from snake_case to Title Case
+                    formatted_key = ' '.join(word.capitalize() for word in key.split('_'))
+                    company_info.append(f"{formatted_key}: {value}")
+            return '\n'.join(company_info)
+        else:
+            # For other cases, create vCard format; missing fields are left empty, not "None"
+            fields = {key: data.get(key) or '' for key in ('name', 'company', 'position', 'phone', 'email', 'website')}
+            return f"""BEGIN:VCARD
+VERSION:3.0
+FN:{fields['name']}
+ORG:{fields['company']}
+TITLE:{fields['position']}
+TEL:{fields['phone']}
+EMAIL:{fields['email']}
+URL:{fields['website']}
+END:VCARD"""
+
+    @staticmethod
+    def render_qr_code(qr_data: str, box_size: int = 10, border: int = 4,
+                       version: Optional[str] = None, fmt: str = 'png', size: int = None) -> bytes:
+        """
+        Render qr_data, served from the QR cache when it was rendered before.
+        fmt is 'png' (box_size pixels per module), 'png1' (1-bit PNG of size
+        pixels) or 'svg' (scalable, size sets its nominal width).
+        """
+        cache_key = QRCache.make_key(qr_data, _qr_options(box_size, border, fmt, size), version)
+        cached_image = qr_cache.get(cache_key, fmt)
+        if cached_image is not None:
+            return cached_image
+        
+        image_bytes = _render_qr(qr_data, box_size, border, fmt, size)
+        qr_cache.set(cache_key, image_bytes, fmt)
+        return image_bytes
+
+    @staticmethod
+    def generate_qr_codes(items: list, versions: list = None, fmt: str = 'png', size: int = None,
+                          max_workers: int = None) -> list:
+        """
+        Generate QR codes for many cards or companies in one call. Cached codes
+        are returned directly and the rest are rendered in a process pool.
+        Returns a (qr_code_bytes, qr_code_data) tuple per item, in order.
+        versions, when given, needs one entry per item.
+        """
+        if versions is None:
+            versions = [None] * len(items)
+        elif len(versions) != len(items):
+            raise ValueError(f"Got {len(versions)} versions for {len(items)} QR code items")
         try:
-            image = Image.open(io.BytesIO(image_bytes))
-            decoded_objects = decode(image)
+            options = _qr_options(10, 4, fmt, size)
             
-            if decoded_objects:
-                return decoded_objects[0].data.decode('utf-8')
-            return None
+            payloads = [Scanner.qr_payload(data) for data in items]
+            keys = [QRCache.make_key(payload, options, version) for payload, version in zip(payloads, versions)]
+            images = [qr_cache.get(key, fmt) for key in keys]
+            missing = [i for i, image in enumerate(images) if image is None]
+            
+            if missing:
+                args = [(payloads[i], 10, 4, fmt, size) for i in missing]
+                # A pool only pays off once there is enough pure-Python encoding to spread
+                if len(missing) < QR_BATCH_POOL_THRESHOLD:
+                    rendered = [_render_qr(*arg) for arg in args]
+                else:
+                    workers = max_workers or os.cpu_count() or 1
+                    with ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT) as executor:
+                        rendered = list(executor.map(
+                            _render_qr, *zip(*args), chunksize=max(1, len(args) // (workers * 4))
+                        ))
+                for i, image_bytes in zip(missing, rendered):
+                    images[i] = image_bytes
+                    qr_cache.set(keys[i], image_bytes, fmt)
+            
+            return list(zip(images, payloads))
             
         except Exception as e:
-            raise Exception(f"Error scanning QR code: {str(e)}")
-    
+            raise Exception(f"Error generating QR codes: {str(e)}")
+
     @staticmethod
-    def generate_qr_code(data: dict) -> tuple[bytes, str]:
+    def generate_qr_code(data: dict, version: Optional[str] = None, fmt: str = 'png',
+                         size: int = None) -> tuple[bytes, str]:
         """
         Generate QR code from business card or company data.
+        Rendered images are cached; pass the record's updated_at as version
+        so edits are picked up. See render_qr_code for fmt and size.
         Returns (qr_code_image_bytes, qr_code_data)
         """
         try:
-            if data.get('type') == 'business_card' and 'raw_text' in data:
-                # For business cards with raw text, use the raw text directly
-                qr_data = data['raw_text']
-            elif data.get('type') == 'company':
-                # For company data, create a formatted string
-                company_info = []
-                for key, value in data.items():
-                    if key != 'type' and value:  # Skip 'type' field and None values
-                        # Convert key from snake_case to Title Case
-                        formatted_key = ' '.join(word.capitalize() for word in key.split('_'))
-                        company_info.append(f"{formatted_key}: {value}")
-                qr_data = '\n'.join(company_info)
-            else:
-                # For other cases, create vCard format
-                vcard_data = f"""BEGIN:VCARD
-VERSION:3.0
-FN:{data.get('name', '')}
-ORG:{data.get('company', '')}
-TITLE:{data.get('position', '')}
-TEL:{data.get('phone', '')}
-EMAIL:{data.get('email', '')}
-URL:{data.get('website', '')}
-END:VCARD"""
-                qr_data = vcard_data
-            
-            # Generate QR code
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(qr_data)
-            qr.make(fit=True)
-            
-            # Create QR code image
-            qr_image = qr.make_image(fill_color="black", back_color="white")
-            
-            # Convert to bytes
-            img_byte_arr = io.BytesIO()
-            qr_image.save(img_byte_arr, format='PNG')
-            img_byte_arr = img_byte_arr.getvalue()
-            
-            return img_byte_arr, qr_data
+            qr_data = Scanner.qr_payload(data)
+            return Scanner.render_qr_code(qr_data, version=version, fmt=fmt, size=size), qr_data
             
         except Exception as e:
             raise Exception(f"Error generating QR code: {str(e)}")
     
     @staticmethod
     def save_image(image_bytes: bytes, directory: str = "uploads") -> str:
-        """Save image to disk and return the file path."""
+        """
+        Save image to the content-addressed store under directory, in the
+        archival format, and return the file path. Identical images share one file.
+        """
         try:
-            # Create directory if it doesn't exist
-            os.makedirs(directory, exist_ok=True)
-            
-            # Generate unique filename
-            filename = f"{datetime.now().strftime('%Y%m%d')}_{uuid.uuid4().hex[:8]}.png"
-            filepath = os.path.join(directory, filename)
-            
-            # Save image
-            with open(filepath, 'wb') as f:
-                f.write(image_bytes)
-            
-            return filepath
+            path = blob_store(directory).put_upload(image_bytes)
+            _save_thumbnails(path)
+            return path
             
         except Exception as e:
-            raise Exception(f"Error saving image: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Error saving image: {str(e)}") 
+    
+    @staticmethod
+    def split_cards(images: Iterable[tuple[str, bytes]]) -> Iterator[tuple[str, bytes]]:
+        """
+        Expand photos of several cards into one (name, image_bytes) item per card,
+        named "<name> #<n>". Images holding a single card pass through unchanged.
+        """
+        for name, image_bytes in images:
+            try:
+                crops = ScanJob(image_bytes).split_cards()
+            except Exception as e:
+                # Let the scan itself report an undecodable image
+                logger.warning(f"Could not segment {name}: {e}")
+                crops = [image_bytes]
+            if len(crops) == 1:
+                yield name, crops[0]
+            else:
+                for number, crop in enumerate(crops, start=1):
+                    yield f"{name} #{number}", crop
+
+    @staticmethod
+    def scan_photo(image_bytes: bytes, max_workers: int = None, directory: str = "uploads") -> Iterator[dict]:
+        """
+        Segment a photo of several cards and OCR, parse, QR-scan and store each
+        card in parallel. Yields one Scanner.scan_batch result per card.
+        """
+        return Scanner.scan_batch(Scanner.split_cards([("photo", image_bytes)]), max_workers, directory)
+
+    @staticmethod
+    def scan_image(name: str, image_bytes: bytes, directory: str = "uploads") -> dict:
+        """
+        OCR, parse, QR-scan and store one image, as each worker of scan_batch
+        does; for callers running their own process pool. Failures are
+        reported in the 'error' key of the result dict instead of raised.
+        """
+        result = {'name': name, 'raw_text': None, 'parsed_info': None,
+                  'qr_code_data': None, 'image_path': None, 'error': None}
+        try:
+            job = ScanJob(image_bytes)
+            try:
+                result['qr_code_data'], result['parsed_info'] = job.scan_contact_qr()
+            except Exception:
+                # A failed QR scan should not stop the card from being OCR'd
+                pass
+            if result['parsed_info'] is None:
+                result['raw_text'], result['parsed_info'] = job.extract_text()
+            result['image_path'] = job.save_image(directory=directory)
+        except Exception as e:
+            result['error'] = str(e)
+        return result
+
+    @staticmethod
+    def scan_batch(images: Iterable[tuple[str, bytes]], max_workers: int = None,
+                   directory: str = "uploads") -> Iterator[dict]:
+        """
+        OCR, parse, QR-scan and store many images across a process pool.
+        Cards carrying a vCard or MeCard QR code are filled from it without OCR.
+        Yields one result dict per image in completion order; failures are
+        reported in the 'error' key instead of aborting the batch.
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=POOL_CONTEXT) as executor:
+            futures = {
+                executor.submit(Scanner.scan_image, name, image_bytes, directory): name
+                for name, image_bytes in images
+            }
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    # The worker process itself died
+                    yield {'name': futures[future], 'raw_text': None, 'parsed_info': None,
+                           'qr_code_data': None, 'image_path': None, 'error': str(e)}
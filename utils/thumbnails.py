@@ -0,0 +1,79 @@
+import io
+import logging
+import os
+import uuid
+from typing import Optional
+
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+# Longest side in pixels of each thumbnail size
+THUMBNAIL_SIZES = {'small': 160, 'medium': 480}
+# WebP where Pillow was built with it, JPEG otherwise
+THUMBNAIL_FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
+THUMBNAIL_EXTENSION = 'webp' if THUMBNAIL_FORMAT == 'WEBP' else 'jpg'
+THUMBNAIL_QUALITY = 80
+
+def thumbnail_file(path: str, size: str) -> str:
+    """Location of a thumbnail, next to its original: <stem>.thumb-<px>.<ext>."""
+    stem = os.path.splitext(path)[0]
+    return f"{stem}.thumb-{THUMBNAIL_SIZES[size]}.{THUMBNAIL_EXTENSION}"
+
+def is_thumbnail(path: str) -> bool:
+    """True for files written by this module."""
+    return '.thumb-' in os.path.basename(path)
+
+def _write(image: Image.Image, path: str, max_side: int):
+    """Encode one thumbnail and move it into place atomically."""
+    thumb = image.copy()
+    thumb.thumbnail((max_side, max_side), Image.LANCZOS, reducing_gap=3.0)
+    if thumb.mode not in ('RGB', 'L'):
+        # Flatten transparency onto white like the OCR preprocessing does
+        rgba = thumb.convert('RGBA')
+        thumb = Image.new('RGB', rgba.size, (255, 255, 255))
+        thumb.paste(rgba, mask=rgba.getchannel('A'))
+    buffer = io.BytesIO()
+    thumb.save(buffer, format=THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(buffer.getvalue())
+    os.replace(tmp_path, path)
+
+def create_thumbnails(path: str, image: Optional[Image.Image] = None) -> dict:
+    """
+    Write every thumbnail size for the image stored at path. Pass the decoded
+    image when the caller already has it (e.g. a ScanJob at save time).
+    Returns {size: thumbnail path}.
+    """
+    paths = {size: thumbnail_file(path, size) for size in THUMBNAIL_SIZES}
+    missing = [size for size, thumb in paths.items() if not os.path.exists(thumb)]
+    if not missing:
+        return paths
+    if image is None:
+        with Image.open(path) as source:
+            # Let the JPEG decoder scale down while decoding
+            largest = max(THUMBNAIL_SIZES.values())
+            source.draft('RGB', (largest * 2, largest * 2))
+            image = ImageOps.exif_transpose(source)
+            image.load()
+    for size in missing:
+        _write(image, paths[size], THUMBNAIL_SIZES[size])
+    return paths
+
+def thumbnail_path(path: str, size: str = 'medium') -> str:
+    """
+    Return the thumbnail of the image at path, creating the thumbnails on
+    first use for images stored before thumbnails existed. Falls back to the
+    original if no thumbnail can be made.
+    """
+    thumb = thumbnail_file(path, size)
+    if os.path.exists(thumb):
+        return thumb
+    try:
+        return create_thumbnails(path)[size]
+    except FileNotFoundError:
+        raise
+    except Exception as e:
+        logger.warning(f"Could not create thumbnail for {path}: {e}")
+        return path
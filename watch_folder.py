@@ -0,0 +1,261 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from database.db import db
+from database.models import User
+from utils.ingest import CardIngestor
+from utils.scanner import Scanner
+
+logger = logging.getLogger(__name__)
+
+# Scanner output picked up from the watched directory
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+class WatchFolderService:
+    """
+    Long-running ingest of a scanner output directory. A poller queues new
+    files on an asyncio queue, workers run the Scanner pipeline in a process
+    pool with bounded concurrency, and a writer saves cards in batches before
+    moving each source file into the archive (or failed) directory.
+    """
+
+    def __init__(self, watch_dir: str, user_id: int, event_name: str = None,
+                 archive_dir: str = None, failed_dir: str = None, upload_dir: str = "uploads",
+                 workers: int = None, batch_size: int = 20, flush_interval: float = 2.0,
+                 poll_interval: float = 1.0, stats_path: str = None):
+        self.watch_dir = watch_dir
+        self.user_id = user_id
+        self.event_name = event_name
+        self.archive_dir = archive_dir or os.path.join(watch_dir, "archive")
+        self.failed_dir = failed_dir or os.path.join(watch_dir, "failed")
+        self.upload_dir = upload_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.stats_path = stats_path
+
+        self._pending = {}   # path -> (size, mtime) seen on the previous poll
+        self._claimed = set()  # paths queued or in progress
+        self._stop = None
+        self.counters = {
+            'queued': 0, 'in_progress': 0, 'processed': 0, 'failed': 0,
+            'last_lag_seconds': 0.0, 'max_lag_seconds': 0.0
+        }
+
+    def stats(self) -> dict:
+        """Return a snapshot of the queue depth and processing counters."""
+        return {**self.counters, 'queue_depth': self._queue.qsize() if hasattr(self, '_queue') else 0}
+
+    def _scan_directory(self) -> list:
+        """
+        Return image files whose size and mtime did not change since the last
+        poll, so files still being written by the scanner are left alone.
+        """
+        ready = []
+        current = {}
+        with os.scandir(self.watch_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                if entry.path in self._claimed:
+                    continue
+                stat = entry.stat()
+                signature = (stat.st_size, stat.st_mtime)
+                if self._pending.get(entry.path) == signature:
+                    ready.append((entry.path, stat.st_mtime))
+                else:
+                    current[entry.path] = signature
+        self._pending = current
+        return ready
+
+    async def _poll(self):
+        """Feed stable new files into the queue until stopped."""
+        while not self._stop.is_set():
+            try:
+                ready = await asyncio.to_thread(self._scan_directory)
+            except OSError as e:
+                logger.error(f"Cannot scan {self.watch_dir}: {e}")
+                ready = []
+            for path, mtime in sorted(ready, key=lambda item: item[1]):
+                self._claimed.add(path)
+                self.counters['queued'] += 1
+                # Blocks while the queue is full, which throttles the poller
+                await self._queue.put((path, mtime))
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _work(self, executor: ProcessPoolExecutor):
+        """Run queued files through the Scanner pipeline in the process pool."""
+        loop = asyncio.get_running_loop()
+        while True:
+            path, mtime = await self._queue.get()
+            self.counters['in_progress'] += 1
+            try:
+                with open(path, 'rb') as f:
+                    image_bytes = f.read()
+                result = await loop.run_in_executor(
+                    executor, Scanner.scan_image, os.path.basename(path), image_bytes, self.upload_dir
+                )
+            except Exception as e:
+                result = {'name': os.path.basename(path), 'raw_text': None, 'parsed_info': None,
+                          'qr_code_data': None, 'image_path': None, 'error': str(e)}
+            finally:
+                self.counters['in_progress'] -= 1
+                self._queue.task_done()
+            result['source_path'] = path
+            result['source_mtime'] = mtime
+            await self._results.put(result)
+
+    async def _write(self):
+        """Save results in batches and archive their source files; None flushes and exits."""
+        batch = []
+        while True:
+            try:
+                timeout = self.flush_interval if batch else None
+                result = await asyncio.wait_for(self._results.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                result = False
+            if result:
+                batch.append(result)
+                if len(batch) < self.batch_size:
+                    continue
+            if batch:
+                await asyncio.to_thread(self._persist, batch)
+                batch = []
+            if result is None:
+                return
+
+    def _persist(self, batch: list):
+        """Write one batch through CardIngestor and move the source files."""
+        results = list(CardIngestor.persist(batch, self.user_id, self.event_name, self.batch_size))
+        now = time.time()
+        for result in results:
+            failed = bool(result.get('error'))
+            if failed:
+                logger.warning(f"Failed to ingest {result['name']}: {result['error']}")
+                self.counters['failed'] += 1
+            else:
+                self.counters['processed'] += 1
+            lag = now - result['source_mtime']
+            self.counters['last_lag_seconds'] = round(lag, 3)
+            self.counters['max_lag_seconds'] = round(max(self.counters['max_lag_seconds'], lag), 3)
+            self._move(result['source_path'], self.failed_dir if failed else self.archive_dir)
+            self._claimed.discard(result['source_path'])
+        self._write_stats()
+
+    @staticmethod
+    def _move(path: str, directory: str):
+        """Atomically move path into directory without overwriting an earlier file."""
+        target = os.path.join(directory, os.path.basename(path))
+        if os.path.exists(target):
+            stem, ext = os.path.splitext(os.path.basename(path))
+            target = os.path.join(directory, f"{stem}_{datetime.now().strftime('%Y%m%d%H%M%S%f')}{ext}")
+        try:
+            os.replace(path, target)
+        except OSError as e:
+            logger.error(f"Could not move {path} to {directory}: {e}")
+
+    def _write_stats(self):
+        """Publish the counters to stats_path, if configured, atomically."""
+        if not self.stats_path:
+            return
+        tmp_path = f"{self.stats_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({**self.stats(), 'updated_at': datetime.utcnow().isoformat()}, f)
+        os.replace(tmp_path, self.stats_path)
+
+    async def _report(self, interval: float):
+        """Log the counters periodically."""
+        while True:
+            await asyncio.sleep(interval)
+            stats = self.stats()
+            logger.info(
+                f"queue depth {stats['queue_depth']}, in progress {stats['in_progress']}, "
+                f"processed {stats['processed']}, failed {stats['failed']}, "
+                f"lag {stats['last_lag_seconds']:.1f}s (max {stats['max_lag_seconds']:.1f}s)"
+            )
+            await asyncio.to_thread(self._write_stats)
+
+    def stop(self):
+        """Ask the service to finish in-flight files and exit."""
+        if self._stop is not None:
+            self._stop.set()
+
+    async def run(self, report_interval: float = 30.0):
+        """Watch the directory until stop() is called."""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        os.makedirs(self.failed_dir, exist_ok=True)
+        self._stop = asyncio.Event()
+        # Bounded so a large backlog does not sit in memory as file bytes
+        self._queue = asyncio.Queue(maxsize=self.workers * 2)
+        self._results = asyncio.Queue()
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                # Not available on Windows; Ctrl+C raises KeyboardInterrupt instead
+                pass
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            workers = [asyncio.create_task(self._work(executor)) for _ in range(self.workers)]
+            writer = asyncio.create_task(self._write())
+            reporter = asyncio.create_task(self._report(report_interval))
+            try:
+                await self._poll()
+                # Finish what was already queued before shutting down
+                await self._queue.join()
+            finally:
+                for task in (*workers, reporter):
+                    task.cancel()
+                await asyncio.gather(*workers, reporter, return_exceptions=True)
+                await self._results.put(None)
+                await writer
+                self._write_stats()
+
+def main():
+    """Ingest business card images dropped into a directory."""
+    parser = argparse.ArgumentParser(description="Watch a directory and ingest business card scans.")
+    parser.add_argument("directory", help="Directory the scanner writes images to")
+    parser.add_argument("--user", required=True, help="Username the cards are created by")
+    parser.add_argument("--event", default=None, help="Event name stored on the cards")
+    parser.add_argument("--archive", default=None, help="Where processed files go (default: <directory>/archive)")
+    parser.add_argument("--failed", default=None, help="Where failed files go (default: <directory>/failed)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="OCR processes")
+    parser.add_argument("--batch-size", type=int, default=20, help="Cards saved per transaction")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between directory scans")
+    parser.add_argument("--stats-file", default=None, help="JSON file the counters are written to")
+    args = parser.parse_args()
+
+    with db.get_session() as session:
+        user = session.query(User).filter(User.username == args.user).first()
+        if user is None:
+            print(f"Unknown user: {args.user}")
+            sys.exit(1)
+        user_id = user.id
+
+    service = WatchFolderService(
+        args.directory, user_id, args.event, archive_dir=args.archive, failed_dir=args.failed,
+        workers=args.workers, batch_size=args.batch_size, poll_interval=args.poll_interval,
+        stats_path=args.stats_file
+    )
+    print(f"Watching {args.directory} (Ctrl+C to stop)")
+    try:
+        asyncio.run(service.run())
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+if __name__ == "__main__":
+    main()